@@ -1,11 +1,39 @@
+from __future__ import annotations
+
 import re
-import aiohttp
+import ssl
+import sys
+import time
 import asyncio
-import aiofiles
+import importlib.util
 from pathlib import Path
+from collections import deque
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
 import argparse
+import json
 import logging
-from rich.progress import Progress
+
+
+def lazy_import(name: str):
+    """Import a module on first attribute access so the CLI starts without loading it."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# aiohttp, aiofiles and rich are only loaded once a download starts.
+aiohttp = lazy_import("aiohttp")
+aiofiles = lazy_import("aiofiles")
+rich_progress = lazy_import("rich.progress")
 
 # Set up logging configuration
 logging.basicConfig(
@@ -14,8 +42,118 @@ logging.basicConfig(
     datefmt="[%X]"
 )
 
+THROTTLE_STATUSES = (429, 503)
+MAX_THROTTLE_RETRIES = 8
+
+
+def parse_retry_after(value: str) -> float:
+    """Return the Retry-After header as a delay in seconds (0 if absent or invalid)."""
+    if not value:
+        return 0.0
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class HostRateLimiter:
+    """Token bucket plus AIMD concurrency window for a single host.
+
+    Successful, fast responses grow the request rate and the number of
+    in-flight requests additively; 429/503 responses halve both and pause the
+    host for the Retry-After delay. Slow responses shrink the window gently so
+    we back off before the server starts refusing us.
+    """
+
+    def __init__(self, rate: float = 4.0, burst: int = 8, concurrency: int = 4,
+                 min_rate: float = 0.5, max_rate: float = 50.0,
+                 max_concurrency: int = 32, latency_target: float = 2.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.concurrency = float(concurrency)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self.condition = asyncio.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.in_flight < int(self.concurrency) and self.tokens >= 1:
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        return
+                    wait = (1 - self.tokens) / self.rate if self.tokens < 1 else None
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, status: int, latency: float, retry_after: float = 0.0):
+        async with self.condition:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif latency > self.latency_target:
+                self.concurrency = max(1.0, self.concurrency * 0.75)
+            elif status == 200:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+                self.rate = min(self.max_rate, self.rate + 0.5)
+            self.condition.notify_all()
+
+
+class RateController:
+    """Hands out one HostRateLimiter per host name."""
+
+    def __init__(self, **limiter_options):
+        self.limiter_options = limiter_options
+        self.limiters = {}
+
+    def for_url(self, url: str) -> HostRateLimiter:
+        host = urlsplit(url).hostname or ""
+        if host not in self.limiters:
+            self.limiters[host] = HostRateLimiter(**self.limiter_options)
+        return self.limiters[host]
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Build a keep-alive session with cached DNS and one shared TLS context.
+
+    Reusing the session (and its SSL context) across downloads lets aiohttp
+    keep connections open and resume TLS sessions instead of handshaking again.
+    """
+    conn = aiohttp.TCPConnector(limit=32, limit_per_host=32, ttl_dns_cache=600,
+                                keepalive_timeout=90, ssl=ssl.create_default_context())
+    return aiohttp.ClientSession(connector=conn)
+
+
+async def ainput(prompt: str) -> str:
+    """input() that does not block the event loop."""
+    return await asyncio.to_thread(input, prompt)
+
+
 class MangaDownloader:
-    def __init__(self, manga_name: str, uppercase: bool = False, edit: bool = False):
+    def __init__(self, manga_name: str, uppercase: bool = False, edit: bool = False,
+                 rate_controller: RateController = None):
         if edit:
             self.manga_name = manga_name
         else:
@@ -26,6 +164,11 @@ class MangaDownloader:
         self.manga_folder = Path("MANGA") / self.formatted_manga_name
         self.manga_folder.mkdir(parents=True, exist_ok=True)  # Ensure the folder exists
         self.history_file = Path("download_history.txt")
+        self.rate_controller = rate_controller
+        self.progress = None
+        self.chapter_list = None
+        self.missing_file = self.manga_folder / "missing_chapters.json"
+        self.missing_chapters = self.load_missing()
 
     def format_chapter_number(self, chapter_number: str) -> str:
         if '.' in chapter_number:
@@ -35,23 +178,75 @@ class MangaDownloader:
             formatted_chapter_number = f"{int(chapter_number):04d}"
         return formatted_chapter_number
 
+    def load_missing(self) -> set:
+        if self.missing_file.exists():
+            try:
+                return set(json.loads(self.missing_file.read_text(encoding="utf-8")))
+            except ValueError:
+                logging.warning(f"Ignoring unreadable {self.missing_file}")
+        return set()
+
+    def save_missing(self):
+        self.missing_file.write_text(json.dumps(sorted(self.missing_chapters, key=float)), encoding="utf-8")
+
+    def mark_missing(self, chapter_number: str):
+        """Remember a chapter the reader does not have so it is never fetched again."""
+        chapter = normalize_chapter(chapter_number)
+        if chapter not in self.missing_chapters:
+            self.missing_chapters.add(chapter)
+            self.save_missing()
+            logging.info(f"Chapter {chapter} of '{self.manga_name}' does not exist; cached as missing.")
+
     async def generate_image_url(self, chapter_number: str, png_number: int, manga_address: str) -> str:
         base_url = f"https://{manga_address}/manga/{{}}/{{}}-{{:03d}}.png"
         url = base_url.format(self.formatted_manga_name, chapter_number, png_number)
         return url
 
+    async def fetch(self, session: aiohttp.ClientSession, url: str, as_text: bool = False):
+        """GET a URL through the per-host rate limiter, retrying 429/503 responses.
+
+        Returns (status, body); body is None for non-200 responses.
+        """
+        if self.rate_controller is None:
+            self.rate_controller = RateController()
+        limiter = self.rate_controller.for_url(url)
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await limiter.acquire()
+            started = time.monotonic()
+            status, body, retry_after = 0, None, 0.0
+            try:
+                async with session.get(url) as response:
+                    status = response.status
+                    if status == 200:
+                        body = await (response.text() if as_text else response.read())
+                    elif status in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            finally:
+                await limiter.release(status, time.monotonic() - started, retry_after)
+
+            if status not in THROTTLE_STATUSES:
+                return status, body
+            logging.warning(f"Throttled by {urlsplit(url).hostname} (HTTP {status}), "
+                            f"retry {attempt + 1}/{MAX_THROTTLE_RETRIES} for {url}")
+
+        return status, None
+
     async def download_image(self, session: aiohttp.ClientSession, url: str, path: Path) -> bool:
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    path.parent.mkdir(parents=True, exist_ok=True)
-                    async with aiofiles.open(path, 'wb') as file:
-                        await file.write(await response.read())
-                    logging.info(f"Downloaded: {url}")
-                    return True
-                else:
-                    logging.warning(f"Failed to download {url}: {response.status}")
-                    return False
+            status, content = await self.fetch(session, url)
+            if status == 200:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                async with aiofiles.open(path, 'wb') as file:
+                    await file.write(content)
+                logging.info(f"Downloaded: {url}")
+                return True
+            elif status in THROTTLE_STATUSES:
+                logging.error(f"Giving up on {url}: still throttled (HTTP {status}) after {MAX_THROTTLE_RETRIES} retries")
+                return False
+            else:
+                logging.warning(f"Failed to download {url}: {status}")
+                return False
         except aiohttp.ClientError as e:
             logging.error(f"Error downloading {url}: {e}")
             return False
@@ -65,27 +260,91 @@ class MangaDownloader:
         formatted_chapter_number = self.format_chapter_number(chapter_number)
         url = f"https://manga4life.com/read-online/{self.formatted_manga_name}-chapter-{formatted_chapter_number}.html"
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    html_content = await response.text()
-                    manga_address = self.extract_text_from_html(html_content)
-                    if not manga_address:
-                        logging.warning(f"Could not find 'vm.CurPathName' for manga '{self.manga_name}', chapter '{formatted_chapter_number}'.")
-                        url = f"https://manga4life.com/read-online/{self.formatted_manga_name}-chapter-{formatted_chapter_number}-index-2.html"
-                        async with session.get(url) as alt_response:
-                            if alt_response.status == 200:
-                                html_content = await alt_response.text()
-                                manga_address = self.extract_text_from_html(html_content)
-                                if not manga_address:
-                                    logging.warning(f"Alternative URL also failed for '{self.manga_name}', chapter '{formatted_chapter_number}'.")
-                    return manga_address
-                else:
-                    logging.error(f"Error accessing {url}: HTTP {response.status}")
-                    return None
+            status, html_content = await self.fetch(session, url, as_text=True)
+            if status == 200:
+                manga_address = self.extract_text_from_html(html_content)
+                if not manga_address:
+                    logging.warning(f"Could not find 'vm.CurPathName' for manga '{self.manga_name}', chapter '{formatted_chapter_number}'.")
+                    url = f"https://manga4life.com/read-online/{self.formatted_manga_name}-chapter-{formatted_chapter_number}-index-2.html"
+                    alt_status, html_content = await self.fetch(session, url, as_text=True)
+                    if alt_status == 200:
+                        manga_address = self.extract_text_from_html(html_content)
+                        if not manga_address:
+                            logging.warning(f"Alternative URL also failed for '{self.manga_name}', chapter '{formatted_chapter_number}'.")
+                            self.mark_missing(chapter_number)
+                    elif alt_status == 404:
+                        self.mark_missing(chapter_number)
+                return manga_address
+            else:
+                logging.error(f"Error accessing {url}: HTTP {status}")
+                if status == 404:
+                    self.mark_missing(chapter_number)
+                return None
         except aiohttp.ClientError as e:
             logging.error(f"Error accessing {url}: {e}")
             return None
 
+    def decode_chapter_code(self, code: str) -> str:
+        """Turn a reader chapter code such as '100105' into '10.5'.
+
+        The first digit is the index (volume/season), the last is the decimal
+        part, and the digits in between are the chapter number.
+        """
+        number = str(int(code[1:-1]))
+        return number if code[-1] == '0' else f"{number}.{code[-1]}"
+
+    async def fetch_chapter_list(self, session: aiohttp.ClientSession) -> list:
+        """Return every chapter number the series page lists (oldest first)."""
+        url = f"https://manga4life.com/manga/{self.formatted_manga_name}"
+        try:
+            status, html_content = await self.fetch(session, url, as_text=True)
+        except aiohttp.ClientError as e:
+            logging.error(f"Error accessing {url}: {e}")
+            return []
+        if status != 200:
+            logging.error(f"Error accessing {url}: HTTP {status}")
+            return []
+
+        match = re.search(r'vm\.Chapters\s*=\s*(\[.*?\]);', html_content)
+        if not match:
+            logging.warning(f"Could not find the chapter list for '{self.manga_name}'.")
+            return []
+        chapters = {self.decode_chapter_code(entry["Chapter"]) for entry in json.loads(match.group(1))}
+        return sorted(chapters, key=float)
+
+    async def plan_chapters(self, session: aiohttp.ClientSession, chapters_str: str) -> list:
+        """Resolve a chapter spec against the series' real chapter list.
+
+        The list is fetched once per downloader. Chapters it contains are
+        dropped from the missing cache (they have been released since); when
+        it cannot be fetched the spec is expanded blindly with parse_chapters.
+        Known-missing chapters are never returned.
+        """
+        if self.chapter_list is None:
+            self.chapter_list = await self.fetch_chapter_list(session)
+
+        if self.chapter_list:
+            released = self.missing_chapters.intersection(self.chapter_list)
+            if released:
+                self.missing_chapters -= released
+                self.save_missing()
+            chapters = select_chapters(chapters_str, self.chapter_list)
+        else:
+            chapters = parse_chapters(chapters_str)
+
+        skipped = [chapter for chapter in chapters if normalize_chapter(chapter) in self.missing_chapters]
+        if skipped:
+            logging.info(f"Skipping known-missing chapter(s) of '{self.manga_name}': {', '.join(skipped)}")
+        return [chapter for chapter in chapters if normalize_chapter(chapter) not in self.missing_chapters]
+
+    def downloaded_chapters(self) -> list:
+        """Chapter numbers that already have at least one page on disk."""
+        chapters = []
+        for folder in self.manga_folder.glob("Chapter-*"):
+            if any(folder.glob("*.png")):
+                chapters.append(normalize_chapter(folder.name.split('-', 1)[1]))
+        return sorted(chapters, key=float)
+
     async def get_total_pages(self, manga_address: str, chapter_number: str) -> int:
         # Implement logic to determine total pages for a given chapter.
         # This could involve scraping or parsing a specific URL that lists pages.
@@ -94,6 +353,8 @@ class MangaDownloader:
         return 10  # Replace with actual page count retrieval logic
 
     async def download_chapter_images(self, session: aiohttp.ClientSession, chapter_number: str) -> bool:
+        if normalize_chapter(chapter_number) in self.missing_chapters:
+            return False
         formatted_chapter_number = self.format_chapter_number(chapter_number)
         manga_address = await self.extract_text_from_url(session, formatted_chapter_number)
         
@@ -104,38 +365,54 @@ class MangaDownloader:
             total_pages = await self.get_total_pages(manga_address, formatted_chapter_number)
 
             png_number = 1
-            with Progress() as progress:
-                task = progress.add_task(f"[blue]Downloading Chapter {formatted_chapter_number}...", total=total_pages)
-
-                while png_number <= total_pages:
-                    url = await self.generate_image_url(formatted_chapter_number, png_number, manga_address)
-                    image_filename = f"{png_number:03d}.png"
-                    image_path = chapter_folder / image_filename
-                    
-                    if await self.download_image(session, url, image_path):
-                        progress.update(task, advance=1)  # Update progress for each successful download
-                    else:
-                        break  # Stop if an image fails to download
-                    
-                    png_number += 1
+            progress = self.progress
+            task = progress.add_task(f"[blue]{self.manga_name} Chapter {formatted_chapter_number}...", total=total_pages)
+
+            while png_number <= total_pages:
+                url = await self.generate_image_url(formatted_chapter_number, png_number, manga_address)
+                image_filename = f"{png_number:03d}.png"
+                image_path = chapter_folder / image_filename
+                
+                if await self.download_image(session, url, image_path):
+                    progress.update(task, advance=1)  # Update progress for each successful download
+                else:
+                    break  # Stop if an image fails to download
+                
+                png_number += 1
             
-            print("[green]Download complete![/green]")
+            progress.remove_task(task)
+            progress.console.print(f"[green]{self.manga_name} Chapter {formatted_chapter_number}: download complete![/green]")
             return png_number > 1
         
         else:
             return False
 
-    async def download_chapters(self, chapters_to_download: list):
-        conn = aiohttp.TCPConnector(limit=10)
-        async with aiohttp.ClientSession(connector=conn) as session:
-            tasks = []
-            for chapter_number in chapters_to_download:
-                tasks.append(self.download_chapter_images(session, chapter_number))
-                if len(tasks) >= 5:  # Limit concurrent tasks to avoid overloading
-                    await asyncio.gather(*tasks)
-                    tasks = []
-            if tasks:
+    async def download_chapters(self, chapters_to_download: str,
+                                session: aiohttp.ClientSession = None, progress: rich_progress.Progress = None):
+        # One-shot callers get their own session/progress; the interactive
+        # mode passes long-lived ones so connections survive between commands.
+        if session is None:
+            async with create_session() as session:
+                return await self.download_chapters(chapters_to_download, session, progress)
+        if progress is None:
+            with rich_progress.Progress() as progress:
+                return await self.download_chapters(chapters_to_download, session, progress)
+
+        if self.rate_controller is None:
+            self.rate_controller = RateController()
+        self.progress = progress
+
+        if isinstance(chapters_to_download, str):
+            chapters_to_download = await self.plan_chapters(session, chapters_to_download)
+
+        tasks = []
+        for chapter_number in chapters_to_download:
+            tasks.append(self.download_chapter_images(session, chapter_number))
+            if len(tasks) >= 5:  # Limit concurrent tasks to avoid overloading
                 await asyncio.gather(*tasks)
+                tasks = []
+        if tasks:
+            await asyncio.gather(*tasks)
         
         await self.save_history(self.manga_name)
 
@@ -152,37 +429,176 @@ class MangaDownloader:
                 await file.write(manga_name + "\n")
                 logging.info(f"Saved {manga_name} to history.")
 
+    async def read_history(self) -> list:
+        if not self.history_file.exists():
+            return []
+        async with aiofiles.open(self.history_file, 'r') as file:
+            history = await file.read()
+        return [line for line in history.splitlines() if line.strip()]
+
     async def load_history(self):
         if self.history_file.exists():
-            async with aiofiles.open(self.history_file, 'r') as file:
-                history = await file.read()
-                history_lines = history.splitlines()
-                logging.info("Download History:")
+            history_lines = await self.read_history()
+            logging.info("Download History:")
+            
+            for manga in history_lines:
+                logging.info(manga)
                 
-                for manga in history_lines:
-                    logging.info(manga)
-                    
         else:
             logging.info("No download history found.")
 
+def normalize_chapter(chapter_number: str) -> str:
+    """'0010', '10' and '10.0' all become '10'; '0010.5' becomes '10.5'."""
+    return str(float(chapter_number)).removesuffix('.0')
+
+def select_chapters(chapters_str: str, available: list) -> list:
+    """Pick chapters from `available` that match a spec.
+
+    Parts are separated by commas: 'N' for one chapter, 'A-B' for an inclusive
+    range, 'A-' or '-B' for open ranges and 'latest' for the newest chapter.
+    Ranges include decimal chapters such as 10.5.
+    """
+    selected = []
+    for part in chapters_str.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part == 'latest':
+            wanted = available[-1:]
+        elif '-' in part:
+            start, _, end = part.partition('-')
+            low = float(start) if start else float('-inf')
+            high = float(end) if end else float('inf')
+            wanted = [chapter for chapter in available if low <= float(chapter) <= high]
+        else:
+            wanted = [chapter for chapter in available if float(chapter) == float(part)]
+            if not wanted:
+                logging.warning(f"Chapter {part} is not available; skipping.")
+        selected.extend(chapter for chapter in wanted if chapter not in selected)
+    return selected
+
 def parse_chapters(chapters_str):
+    """Expand a chapter spec without knowing which chapters exist.
+
+    Only used when the series' chapter list cannot be fetched, so open ranges
+    and 'latest' cannot be resolved and are skipped.
+    """
     chapters = []
     
     for part in chapters_str.split(','):
+        part = part.strip()
+        if not part:
+            continue
         if '-' in part:
-            start, end = map(int, part.split('-'))
-            chapters.extend(range(start, end + 1))
+            start, end = part.split('-')
+            if not start or not end:
+                logging.warning(f"Cannot resolve open range '{part}' without the chapter list; skipping.")
+                continue
+            chapters.extend(range(int(float(start)), int(float(end)) + 1))
+        elif part.lower() == 'latest':
+            logging.warning("Cannot resolve 'latest' without the chapter list; skipping.")
         else:
-            chapters.append(int(part))
+            chapters.append(part)
     
-    return [str(chapter) for chapter in chapters]
+    return [normalize_chapter(str(chapter)) for chapter in chapters]
+
+def parse_manifest(manifest_path: str) -> list:
+    """Read a batch manifest of 'MANGA NAME | CHAPTERS' lines ('#' starts a comment)."""
+    entries = []
+    for line in Path(manifest_path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        manga_name, sep, chapters = line.partition('|')
+        if not sep:
+            logging.warning(f"Skipping manifest line without '|': {line}")
+            continue
+        entries.append((manga_name.strip(), chapters.strip()))
+    return entries
+
+async def download_batch(plan: list, workers: int = 10, session: aiohttp.ClientSession = None):
+    """Download several series through one session and one global scheduler.
+
+    `plan` is a list of (MangaDownloader, chapters) pairs, where chapters is
+    either a spec string (resolved with plan_chapters) or a ready list. Chapters are queued
+    round-robin across series so every series progresses at the same pace, and
+    a fixed pool of workers keeps the link busy while other series are still
+    in their HTML phase. Per-host limits come from the downloaders' shared
+    RateController.
+    """
+    if session is None:
+        async with create_session() as session:
+            return await download_batch(plan, workers, session)
+
+    async def resolve(downloader, chapters):
+        if isinstance(chapters, str):
+            return await downloader.plan_chapters(session, chapters)
+        return chapters
+
+    resolved = await asyncio.gather(*(resolve(downloader, chapters) for downloader, chapters in plan))
+    plan = [(downloader, chapters) for (downloader, _), chapters in zip(plan, resolved)]
+    series = [(downloader, deque(chapters)) for downloader, chapters in plan if chapters]
+    remaining = {downloader: len(chapters) for downloader, chapters in series}
+    jobs = deque()
+    while series:
+        for downloader, chapters in series:
+            jobs.append((downloader, chapters.popleft()))
+        series = [(downloader, chapters) for downloader, chapters in series if chapters]
+
+    with rich_progress.Progress() as progress:
+        async def worker():
+            while jobs:
+                downloader, chapter_number = jobs.popleft()
+                downloader.progress = progress
+                try:
+                    await downloader.download_chapter_images(session, chapter_number)
+                except Exception as e:
+                    logging.error(f"{downloader.manga_name} chapter {chapter_number} failed: {e}")
+                remaining[downloader] -= 1
+                if remaining[downloader] == 0:
+                    await downloader.save_history(downloader.manga_name)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+async def update_tracked(workers: int = 10):
+    """Download new chapters for every series listed in the download history.
+
+    The latest chapter of each series is discovered concurrently from its
+    series page, and only chapters newer than the newest one on disk are
+    queued, so nothing past the real end of a series is ever requested.
+    """
+    rate_controller = RateController()
+    history = await MangaDownloader("dummy").read_history()
+    downloaders = [MangaDownloader(manga_name, edit=True, rate_controller=rate_controller)
+                   for manga_name in history]
+
+    async with create_session() as session:
+        available = await asyncio.gather(*(downloader.fetch_chapter_list(session)
+                                           for downloader in downloaders))
+        plan = []
+        for downloader, chapters in zip(downloaders, available):
+            on_disk = downloader.downloaded_chapters()
+            newest = float(on_disk[-1]) if on_disk else 0.0
+            new_chapters = [chapter for chapter in chapters if float(chapter) > newest]
+            logging.info(f"{downloader.manga_name}: {len(new_chapters)} new chapter(s)"
+                         f" (latest available: {chapters[-1] if chapters else 'unknown'})")
+            plan.append((downloader, new_chapters))
+
+        await download_batch(plan, workers=workers, session=session)
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Manga Downloader")
     parser.add_argument('-d', '--download', metavar='MANGA_NAME', type=str,
                         help="Download manga chapters")
     parser.add_argument('-c', '--chapters', metavar='CHAPTERS', type=str,
-                        help="Chapters to download, separated by commas")
+                        help="Chapters to download: numbers or ranges separated by commas, "
+                             "e.g. '1-10,10.5,120-' or 'latest'")
+    parser.add_argument('-b', '--batch', metavar='MANIFEST', type=str,
+                        help="Download every 'MANGA NAME | CHAPTERS' line of a manifest file")
+    parser.add_argument('-u', '--update', action='store_true',
+                        help="Download new chapters for every series in the download history")
+    parser.add_argument('-w', '--workers', metavar='N', type=int, default=10,
+                        help="Concurrent chapter downloads in batch mode (default: 10)")
     parser.add_argument('-H', '--history', action='store_true',
                         help="View download history")
     parser.add_argument('-U', '--uppercase', action='store_true',
@@ -192,12 +608,86 @@ def parse_args():
     
     return parser.parse_args()
 
+async def interactive():
+    """Interactive mode on one event loop, one session and one progress display.
+
+    Downloads run as background tasks so the next command can be typed while
+    earlier chapters are still transferring. The progress display is live
+    only while nothing is being typed ('w' or 'q'), since it redraws over
+    the prompt line otherwise.
+    """
+    rate_controller = RateController()
+    pending = set()
+
+    def on_done(task):
+        pending.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error(f"Download failed: {task.exception()}")
+
+    async def watch(progress):
+        progress.start()
+        try:
+            await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            progress.stop()
+
+    async with create_session() as session:
+        progress = rich_progress.Progress()
+        downloader = None
+
+        while True:
+            choice = (await ainput("Enter 'd' to download manga, 'w' to watch downloads, "
+                                   "'h' to view history, 'q' to quit: ")).strip().lower()
+
+            if choice == 'd':
+                manga_name = await ainput("Enter the manga name: ")
+                input_chapters = await ainput("Enter the chapter number(s) separated by commas or ranges: ")
+
+                manga = MangaDownloader(manga_name, rate_controller=rate_controller)
+
+                task = asyncio.create_task(manga.download_chapters(input_chapters, session, progress))
+                pending.add(task)
+                task.add_done_callback(on_done)
+
+            elif choice == 'w':
+                if pending:
+                    await watch(progress)
+                else:
+                    logging.info("No downloads running.")
+
+            elif choice == 'h':
+                if downloader is None:
+                    downloader = MangaDownloader("dummy")
+
+                await downloader.load_history()
+
+            elif choice == 'q':
+                break
+
+        if pending:
+            logging.info(f"Waiting for {len(pending)} running download(s) to finish...")
+            await watch(progress)
+
 def main():
     args = parse_args()
 
-    if args.download and args.chapters:
+    if args.update:
+        asyncio.run(update_tracked(workers=args.workers))
+
+    elif args.batch:
+        rate_controller = RateController()
+        plan = [(MangaDownloader(manga_name,
+                                 uppercase=args.uppercase,
+                                 edit=args.edit,
+                                 rate_controller=rate_controller),
+                 chapters)
+                for manga_name, chapters in parse_manifest(args.batch)]
+
+        asyncio.run(download_batch(plan, workers=args.workers))
+
+    elif args.download and args.chapters:
         manga_name = args.download
-        chapters_to_download = parse_chapters(args.chapters)
+        chapters_to_download = args.chapters
         
         downloader = MangaDownloader(manga_name,
                                       uppercase=args.uppercase,
@@ -209,7 +699,7 @@ def main():
         manga_name = args.download
         input_chapters = input("Enter the chapter number(s) separated by commas or ranges: ")
         
-        chapters_to_download = parse_chapters(input_chapters)
+        chapters_to_download = input_chapters
         
         downloader = MangaDownloader(manga_name,
                                       uppercase=args.uppercase,
@@ -223,29 +713,7 @@ def main():
         asyncio.run(downloader.load_history())
     
     else:
-        downloader = None
-        
-        while True:
-            choice = input("Enter 'd' to download manga, 'h' to view history, 'q' to quit: ").strip().lower()
-            
-            if choice == 'd':
-                manga_name = input("Enter the manga name: ")
-                input_chapters = input("Enter the chapter number(s) separated by commas or ranges: ")
-                
-                chapters_to_download = parse_chapters(input_chapters)
-                
-                downloader = MangaDownloader(manga_name)
-                
-                asyncio.run(downloader.download_chapters(chapters_to_download))
-            
-            elif choice == 'h':
-                if downloader is None:
-                    downloader = MangaDownloader("dummy")
-                
-                asyncio.run(downloader.load_history())
-            
-            elif choice == 'q':
-                break
+        asyncio.run(interactive())
 
 if __name__ == '__main__':
     main()
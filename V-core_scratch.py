@@ -7,6 +7,8 @@ import json
 import shutil
 import subprocess
 import platform
+import threading
+from collections import deque
 from datetime import datetime
 
 # =========================
@@ -16,7 +18,12 @@ from datetime import datetime
 VCORE_LOG_DIR = os.path.expanduser("~/Downloads/VCORE_LOGS")
 os.makedirs(VCORE_LOG_DIR, exist_ok=True)
 
-def human_log(filename, title, what, why, tried, cannot_fix):
+RECORDER_EVENTS = 500   # events kept per job
+STALL_SECONDS = 120     # silence before an attempt counts as stalled
+
+def human_log(filename, title, what, why, tried, cannot_fix, trail=None):
+    """Write a report under a timestamped name so failures never overwrite each other."""
+    filename = f"{datetime.now():%Y%m%d-%H%M%S}_{filename}"
     path = os.path.join(VCORE_LOG_DIR, filename)
     with open(path, "w", encoding="utf-8") as f:
         f.write(f"{title}\n")
@@ -29,7 +36,38 @@ def human_log(filename, title, what, why, tried, cannot_fix):
         f.write(tried + "\n\n")
         f.write("Why it could not fix it:\n")
         f.write(cannot_fix + "\n\n")
+        if trail:
+            f.write("Last events before the failure:\n")
+            f.write("\n".join(trail) + "\n\n")
         f.write(f"Timestamp: {datetime.now()}\n")
+    return filename
+
+
+class FlightRecorder:
+    """Black box for one job: the last events in memory, written out only on failure.
+
+    record() only appends a tuple to a bounded deque, so a download that
+    succeeds never touches the disk.
+    """
+
+    def __init__(self, job, size=RECORDER_EVENTS):
+        self.job = job
+        self.events = deque(maxlen=size)
+        self.last_event = time.monotonic()
+
+    def record(self, kind, text="", **data):
+        self.last_event = time.monotonic()
+        self.events.append((time.time(), kind, text, data))
+
+    def flush(self, log_name, log_title, log_data):
+        """Write the events as JSONL next to the human report; returns the report name."""
+        report = human_log(log_name, log_title, trail=[
+            f"{datetime.fromtimestamp(ts):%H:%M:%S} [{kind}] {text}" for ts, kind, text, _ in self.events
+        ][-20:], **log_data)
+        with open(os.path.join(VCORE_LOG_DIR, report.rsplit(".", 1)[0] + ".jsonl"), "w", encoding="utf-8") as f:
+            for ts, kind, text, data in self.events:
+                f.write(json.dumps({"time": ts, "job": self.job, "kind": kind, "text": text, **data}) + "\n")
+        return report
 
 # =========================
 # 🧠 V-CORE CORES
@@ -40,10 +78,30 @@ class FatherCore:
 
     YT_REGEX = re.compile(r'(youtube\.com/watch\?v=|youtu\.be/)[\w-]{11}')
 
+    # Output signatures of a doomed attempt, checked line by line as
+    # yt-dlp / aria2c / ffmpeg print them: (rule, pattern, remedy).
+    RULES = [
+        ("no_space", re.compile(r"No space left on device|Errno 28", re.I), "abort"),
+        ("unavailable", re.compile(r"Video unavailable|Private video|This video has been removed", re.I), "abort"),
+        ("format_missing", re.compile(r"Requested format is not available", re.I), "fallback_format"),
+        ("ffmpeg_missing", re.compile(r"ffmpeg (is )?not (found|installed)|ffprobe and ffmpeg not found", re.I), "single_file"),
+        ("throttled", re.compile(r"HTTP Error 429|Too Many Requests|status=429", re.I), "fewer_connections"),
+        ("aria2_error", re.compile(r"aria2c exited with code|errorCode=(1|9|16|17)\b", re.I), "native_downloader"),
+        ("forbidden", re.compile(r"HTTP Error 403|403: Forbidden", re.I), "re_extract"),
+    ]
+
     @staticmethod
     def check_youtube_url(url):
         return bool(FatherCore.YT_REGEX.search(url))
 
+    @staticmethod
+    def match_line(line):
+        """First rule whose signature appears in an output line, or None."""
+        for name, pattern, remedy in FatherCore.RULES:
+            if pattern.search(line):
+                return name, remedy
+        return None
+
 
 class MotherCore:
     """Attempts fixes based on known playbooks"""
@@ -79,13 +137,55 @@ class MotherCore:
         }
 
 
+    # Playbooks for FatherCore remedies. Each adjusts the plan in place and
+    # returns what it changed, or None when the plan has nothing left to give.
+    @staticmethod
+    def remediate(remedy, plan):
+        if remedy == "native_downloader" and plan["aria2"]:
+            plan["aria2"] = False
+            return "dropped aria2c for yt-dlp's native downloader"
+        if remedy == "fewer_connections" and plan["aria2"] and plan["connections"] > 1:
+            plan["connections"] = max(plan["connections"] // 2, 1)
+            return f"lowered aria2c to {plan['connections']} connection(s)"
+        if remedy == "fewer_connections" and plan["aria2"]:
+            plan["aria2"] = False
+            return "dropped aria2c for yt-dlp's native downloader"
+        if remedy == "re_extract" and plan["re_extracts"] < MAX_RE_EXTRACTS:
+            # 403 means the signed stream URLs went stale, not that the format is wrong
+            plan["re_extracts"] += 1
+            return "re-extracting fresh stream URLs with the same format"
+        if remedy == "fallback_format" and plan["format"] != FALLBACK_FORMATS[-1]:
+            plan["format"] = FALLBACK_FORMATS[FALLBACK_FORMATS.index(plan["format"]) + 1]
+            return f"switched format to '{plan['format']}'"
+        if remedy == "single_file" and plan["format"] != FALLBACK_FORMATS[-1]:
+            plan["format"] = FALLBACK_FORMATS[-1]  # every other entry needs an ffmpeg merge
+            return f"switched format to '{plan['format']}'"
+        return None
+
+    @staticmethod
+    def explain_rule(rule, output_line, tried):
+        return {
+            "what": f"yt-dlp reported: {output_line}",
+            "why": f"V-Core matched the '{rule}' failure signature.",
+            "tried": "\n".join(tried) or "Nothing; this failure has no playbook.",
+            "cannot_fix": "Every remedy for this failure was already used, or none applies."
+        }
+
+
 class ChristCore:
     """Validates actions and decides when to stop"""
 
+    MAX_REMEDIATIONS = 4
+
+    @staticmethod
+    def allow_remediation(remedy, tried):
+        """Approve a mid-flight fix unless the rule is fatal or the budget is spent."""
+        return remedy != "abort" and len(tried) < ChristCore.MAX_REMEDIATIONS
+
     @staticmethod
     def approve_or_abort(condition, log_data, log_name, log_title):
         if not condition:
-            human_log(
+            log_name = human_log(
                 filename=log_name,
                 title=log_title,
                 what=log_data["what"],
@@ -110,6 +210,95 @@ def ensure_yt_dlp():
     except Exception:
         return False
 
+# =========================
+# 📡 STREAMING DOWNLOAD
+# =========================
+
+# Tried in order when a format is rejected; the last needs no ffmpeg merge.
+FALLBACK_FORMATS = ["bv*+ba/b", "bv*[vcodec^=avc1]+ba[ext=m4a]/b", "b"]
+ARIA2_CONNECTIONS = 8
+MAX_RE_EXTRACTS = 2
+
+
+def build_command(url, plan):
+    command = ["yt-dlp", "--newline", "-f", plan["format"]]
+    if plan["re_extracts"]:
+        command.append("--no-cache-dir")  # a cached player signature can be what went stale
+    if plan["aria2"]:
+        conns = plan["connections"]
+        command += ["--external-downloader", "aria2c",
+                    "--external-downloader-args", f"aria2c:-x{conns} -s{conns} -k1M --continue=true"]
+    return command + [url]
+
+
+def watch_for_stall(proc, recorder, stalled):
+    """Stop an attempt that has printed nothing for STALL_SECONDS."""
+    while proc.poll() is None:
+        time.sleep(1)
+        if time.monotonic() - recorder.last_event > STALL_SECONDS:
+            recorder.record("decision", "stalled", seconds=STALL_SECONDS)
+            stalled.set()
+            proc.terminate()
+            return
+
+
+def run_download(url, recorder):
+    """Run yt-dlp, watching its output and fixing the plan mid-flight.
+
+    A line that matches a FatherCore rule stops the attempt right away,
+    MotherCore adjusts the plan and the download restarts from its partial
+    files. Output and decisions go to `recorder`. Returns (ok, log_data)
+    where log_data explains a failure.
+    """
+    plan = {"format": FALLBACK_FORMATS[0],
+            "aria2": bool(shutil.which("aria2c")),
+            "connections": ARIA2_CONNECTIONS,
+            "re_extracts": 0}
+    tried = []
+    while True:
+        matched = None
+        stalled = threading.Event()
+        command = build_command(url, plan)
+        recorder.record("attempt", " ".join(command), **plan)
+        with subprocess.Popen(command, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True) as proc:
+            threading.Thread(target=watch_for_stall, args=(proc, recorder, stalled), daemon=True).start()
+            for line in proc.stdout:
+                print(line, end="")
+                is_tick = line.startswith("[download]") and "%" in line
+                recorder.record("progress" if is_tick else "output", line.rstrip())
+                hit = FatherCore.match_line(line)
+                if hit:
+                    matched = (*hit, line.strip())
+                    proc.terminate()
+                    break
+            proc.wait()
+
+        if not matched:
+            if proc.returncode == 0:
+                return True, None
+            if stalled.is_set():
+                return False, {
+                    "what": f"The download printed nothing for {STALL_SECONDS} seconds.",
+                    "why": "The connection or the tool stalled.",
+                    "tried": "\n".join(tried) or "V-Core executed yt-dlp with the provided link.",
+                    "cannot_fix": "V-Core stopped the stalled attempt; partial files were kept."
+                }
+            return False, {
+                "what": f"yt-dlp exited with code {proc.returncode}.",
+                "why": "The output matched no known failure signature.",
+                "tried": "\n".join(tried) or "V-Core executed yt-dlp with the provided link.",
+                "cannot_fix": "The error occurred inside yt-dlp or the network."
+            }
+
+        rule, remedy, output_line = matched
+        fix = MotherCore.remediate(remedy, plan) if ChristCore.allow_remediation(remedy, tried) else None
+        if not fix:
+            return False, MotherCore.explain_rule(rule, output_line, tried)
+        tried.append(f"{rule}: {fix}")
+        recorder.record("decision", fix, rule=rule)
+        print(f"\n🔧 V-CORE: {rule} detected, {fix}. Restarting...\n")
+
 # =========================
 # 🎥 USER INTERACTION
 # =========================
@@ -162,21 +351,14 @@ def main():
         # If valid, attempt download
         print("✅ Link looks valid. Attempting download...\n")
 
-        try:
-            subprocess.check_call(["yt-dlp", url])
+        recorder = FlightRecorder(url)
+        ok, data = run_download(url, recorder)
+        if ok:
             print("\n🎉 Download completed successfully.")
-            break
-        except Exception as e:
-            human_log(
-                "DOWNLOAD_FAILED.txt",
-                "Download Failed",
-                what=str(e),
-                why="yt-dlp returned an error during download.",
-                tried="V-Core executed yt-dlp with the provided link.",
-                cannot_fix="The error occurred inside yt-dlp or the network."
-            )
-            print("\n❌ Download failed. See V-Core logs.")
-            break
+        else:
+            report = recorder.flush("DOWNLOAD_FAILED.txt", "Download Failed", data)
+            print(f"\n❌ Download failed. See V-Core log: {report}")
+        break
 
 if __name__ == "__main__":
     main()
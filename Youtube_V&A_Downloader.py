@@ -4,6 +4,7 @@ import sys
 import subprocess
 import shutil
 import json
+import time
 import platform
 from urllib.parse import urlparse, parse_qs
 
@@ -112,6 +113,66 @@ def choose_format(is_playlist_flag):
     return f"bestvideo[height<={resolution}]+bestaudio/best", False, resolution, False
 
 
+# ==========================================================
+# MP3 finalization (one ffmpeg pass)
+# ==========================================================
+def mp3_finalize_pp(ffmpeg):
+    """Encode to MP3, embed the cover and write tags in a single ffmpeg run.
+
+    The stock ExtractAudio → EmbedThumbnail → Metadata chain rewrites the
+    whole MP3 three times; this writes it once and reports the cost.
+    """
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class MP3FinalizePP(PostProcessor):
+        def run(self, info):
+            started = time.monotonic()
+            source = info["filepath"]
+            final = os.path.splitext(source)[0] + ".mp3"
+            thumb = next((t["filepath"] for t in reversed(info.get("thumbnails") or [])
+                          if t.get("filepath") and os.path.exists(t["filepath"])), None)
+            if source == final or not info.get("__real_download"):
+                # Finalized on an earlier run; re-encoding would only lose quality.
+                # The cover yt-dlp wrote again is already embedded, so drop it.
+                self.to_screen(f"{os.path.basename(source)}: already an MP3, skipping")
+                return [thumb] if thumb else [], info
+
+            cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", source]
+            if thumb:
+                cmd += ["-i", thumb, "-map", "0:a", "-map", "1:v", "-c:v", "mjpeg",
+                        "-disposition:v", "attached_pic",
+                        "-metadata:s:v", "title=Album cover",
+                        "-metadata:s:v", "comment=Cover (front)"]
+            else:
+                cmd += ["-map", "0:a"]
+            cmd += ["-c:a", "libmp3lame", "-q:a", "0", "-id3v2_version", "3"]
+
+            tags = {
+                "title": info.get("track") or info.get("title"),
+                "artist": info.get("artist") or info.get("uploader"),
+                "album": info.get("album"),
+                "date": (info.get("upload_date") or "")[:4],
+                "comment": info.get("webpage_url"),
+            }
+            for key, value in tags.items():
+                if value:
+                    cmd += ["-metadata", f"{key}={value}"]
+
+            temp = final + ".part"
+            subprocess.run(cmd + ["-f", "mp3", temp], check=True)
+            os.replace(temp, final)
+
+            written = os.path.getsize(final)
+            self.to_screen(f"{os.path.basename(final)}: {written / (1024 * 1024):.1f} MB written "
+                           f"in {time.monotonic() - started:.1f}s (single pass)")
+            # Point yt-dlp at the .mp3 so --print/after_move hooks and the
+            # archive see the file that actually exists.
+            info.update({"filepath": final, "ext": "mp3", "final_ext": "mp3"})
+            return [f for f in (source, thumb) if f and f != final], info
+
+    return MP3FinalizePP()
+
+
 # ==========================================================
 # Resume support
 # ==========================================================
@@ -169,21 +230,15 @@ def download_video(url, fmt, is_audio, resolution, playlist):
             if is_audio:
                 opts.update({
                     "writethumbnail": True,
-                    "postprocessors": [
-                        {"key": "FFmpegExtractAudio", "preferredcodec": "mp3"},
-                        {"key": "EmbedThumbnail"},
-                        {"key": "FFmpegMetadata"},
-                    ],
-                    "postprocessor_args": {
-                        "EmbedThumbnail": [
-                            "-c:v", "mjpeg",
-                            "-metadata:s:v", "title=Album cover"
-                        ]
-                    },
                     "ffmpeg_location": ffmpeg,
+                    # yt-dlp looks for an existing <title>.<final_ext> before
+                    # downloading, so re-runs skip tracks already converted.
+                    "final_ext": "mp3",
                 })
 
             with yt_dlp.YoutubeDL(opts) as ydl:
+                if is_audio:
+                    ydl.add_post_processor(mp3_finalize_pp(ffmpeg), when="post_process")
                 ydl.download([url])
 
         else:
@@ -25,16 +25,20 @@ if ! command -v aria2c &> /dev/null; then
     apt-get install -y aria2
 fi
 
-# Ensure ytd.py exists in the current directory
-if [ ! -f "ytd.py" ]; then
-  echo "Error: ytd.py not found in the current directory."
-  exit 1
-fi
+# Ensure ytd.py and its shared modules exist in the current directory
+for f in ytd.py ydm_limits.py ydm_retry.py ydm_plan.py ydm_queue.py; do
+  if [ ! -f "$f" ]; then
+    echo "Error: $f not found in the current directory."
+    exit 1
+  fi
+done
 
 # Copy the Python script to /usr/local/bin and make it executable
 echo "Installing ytd..."
 cp ytd.py /usr/local/bin/ytd
 chmod +x /usr/local/bin/ytd
+# ytd imports its shared modules from its own directory
+cp ydm_limits.py ydm_retry.py ydm_plan.py ydm_queue.py /usr/local/bin/
 
 echo "ytd has been installed successfully. Use it by typing 'ytd <YouTube URL>'."
 
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ydm301
+
+CHANNEL = "https://www.youtube.com/@someone/videos"
+PLAYLIST = "https://www.youtube.com/playlist?list=PLabc"
+
+
+def stub_entries(monkeypatch, entries):
+    monkeypatch.setattr(ydm301, "iter_source_entries", lambda url: iter(entries))
+
+
+def test_channel_scan_stops_at_known_streak(monkeypatch):
+    # Newest first: two new uploads, then the ones synced last time.
+    stub_entries(monkeypatch, [("n2", "20260302"), ("n1", "20260301"),
+                               ("k3", "20260201"), ("k2", "20260115"), ("k1", "20260101"),
+                               ("old", None)])
+    cursor = {"seen": ["k3", "k2", "k1"]}
+    assert ydm301.find_new_entries(CHANNEL, cursor) == [("n2", "20260302"), ("n1", "20260301")]
+
+
+def test_playlist_finds_entries_appended_at_the_end(monkeypatch):
+    # Playlist order: the known videos first, new ones added at the end.
+    stub_entries(monkeypatch, [("k1", "20260301"), ("k2", "20260101"), ("k3", "20260201"),
+                               ("k4", "20260102"), ("n1", "20250101"), ("n2", "20260401")])
+    cursor = {"seen": ["k1", "k2", "k3", "k4"], "upload_date": "20260301"}
+    assert ydm301.find_new_entries(PLAYLIST, cursor) == [("n2", "20260401"), ("n1", "20250101")]
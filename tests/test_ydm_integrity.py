@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ydm_integrity
+
+
+def test_verify_skips_missing_directory(tmp_path, capsys):
+    (tmp_path / "song.mp3").write_bytes(b"ID3 data")
+    ydm_integrity.record(str(tmp_path / "song.mp3"))
+    assert not ydm_integrity.verify([str(tmp_path / "gone"), str(tmp_path)])
+    out = capsys.readouterr().out
+    assert "Not a directory" in out
+    assert "1 files checked" in out
+
+
+def test_verify_reports_truncated_checkpoint(tmp_path, capsys):
+    part = tmp_path / "video.mp4.part"
+    part.write_bytes(b"abc")
+    (tmp_path / "video.mp4.part.hash").write_text('{"size": 3, "bla')
+    assert ydm_integrity.resume_point(str(part))[0] == 0
+    assert not ydm_integrity.verify([str(tmp_path)])
+    assert "CORRUPT" in capsys.readouterr().out
+
+
+def test_resume_point_restarts_on_hash_mismatch(tmp_path):
+    part = tmp_path / "video.mp4.part"
+    part.write_bytes(b"abcdef")
+    ydm_integrity.save_checkpoint(str(part), 3, ydm_integrity.hash_file(str(part), 3))
+    assert ydm_integrity.resume_point(str(part))[0] == 3
+    part.write_bytes(b"xyzdef")  # bytes under the checkpoint changed
+    offset, digest = ydm_integrity.resume_point(str(part))
+    assert offset == 0
+    assert digest.hexdigest() == ydm_integrity.new_hash().hexdigest()
+    assert not (tmp_path / "video.mp4.part.hash.tmp").exists()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ydm_limits
+
+
+def test_allocation_never_exceeds_ceiling():
+    wants = {f"job{i}": 4 for i in range(5)}
+    allocation = ydm_limits.allocate_connections(wants, ceiling=3)
+    assert sum(allocation.values()) == 3
+    assert allocation == {"job0": 1, "job1": 1, "job2": 1, "job3": 0, "job4": 0}
+
+
+def test_allocation_is_max_min_fair():
+    allocation = ydm_limits.allocate_connections({"a": 4, "b": 1, "c": 40}, ceiling=32)
+    assert allocation == {"a": 4, "b": 1, "c": 27}
+
+
+def test_exit_leaves_no_entry_behind(tmp_path, monkeypatch):
+    monkeypatch.setattr(ydm_limits, "STATE_PATH", str(tmp_path / "jobs.json"))
+    monkeypatch.setattr(ydm_limits, "HEARTBEAT_SECONDS", 0.01)
+    with ydm_limits.JobSlot("test", "example.com", 4) as slot:
+        assert slot.connection_share() == 4
+    assert ydm_limits.update_state() == {}
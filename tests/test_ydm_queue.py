@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ydm_queue
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def queue(request, tmp_path):
+    if request.param == "sqlite":
+        return ydm_queue.SQLiteQueue(str(tmp_path / "queue.sqlite"))
+    return ydm_queue.MemoryQueue()
+
+
+def test_expired_lease_fails_after_max_attempts(queue, monkeypatch):
+    queue.enqueue("https://youtu.be/abcdefghijk")
+    # Every worker dies holding the job: its lease is already over when taken.
+    monkeypatch.setattr(ydm_queue, "LEASE_SECONDS", -1)
+    for attempt in range(1, ydm_queue.MAX_ATTEMPTS + 1):
+        job = queue.lease(f"crashed-{attempt}")
+        assert job["attempts"] == attempt
+    assert queue.lease("next") is None
+    assert queue.counts() == {"failed": 1}
+
+
+def test_expired_lease_is_taken_over(queue, monkeypatch):
+    queue.enqueue("https://youtu.be/abcdefghijk")
+    monkeypatch.setattr(ydm_queue, "LEASE_SECONDS", -1)
+    crashed = queue.lease("crashed")
+    monkeypatch.setattr(ydm_queue, "LEASE_SECONDS", 90)
+    job = queue.lease("healthy")
+    assert job["id"] == crashed["id"]
+    assert not queue.renew(job["id"], "crashed")
+    queue.complete(job["id"], "healthy", True)
+    assert queue.counts() == {"done": 1}
@@ -3,31 +3,52 @@ import subprocess
 import sys
 import re
 import time
-import requests
+import shutil
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Set YDM_CHECK_INTERNET=0 to skip the connectivity check.
+CHECK_INTERNET = os.environ.get("YDM_CHECK_INTERNET", "1") != "0"
 
 def check_dependencies():
-    """Check if required dependencies are installed."""
+    """Check if required dependencies are installed (looked up in parallel)."""
     print("🔍 Checking dependencies...")
     dependencies = ['yt-dlp', 'ffmpeg', 'aria2c']
-    missing = []
-    for dep in dependencies:
-        command = 'where' if os.name == 'nt' else 'which'
-        if subprocess.call([command, dep], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT) != 0:
-            missing.append(dep)
+    with ThreadPoolExecutor(len(dependencies)) as pool:
+        found = list(pool.map(shutil.which, dependencies))
+    missing = [dep for dep, path in zip(dependencies, found) if not path]
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}. Install them first.")
         sys.exit(1)
     print("✅ All dependencies found.")
 
 def check_internet():
-    """Verify internet connectivity."""
-    print("🌐 Checking internet...")
-    try:
-        requests.get("https://www.google.com", timeout=5)
-        print("✅ Connected!")
-    except requests.ConnectionError:
-        print("❌ No internet. Please connect and retry.")
-        sys.exit(1)
+    """Start a connectivity check in the background.
+
+    Returns a function that waits for the result and exits if offline, so
+    the check runs while the user is typing the link.
+    """
+    if not CHECK_INTERNET:
+        return lambda: None
+    result = {}
+
+    def probe():
+        try:
+            socket.create_connection(("www.google.com", 443), timeout=5).close()
+            result["ok"] = True
+        except OSError:
+            result["ok"] = False
+
+    thread = threading.Thread(target=probe, daemon=True)
+    thread.start()
+
+    def wait():
+        thread.join()
+        if not result["ok"]:
+            print("❌ No internet. Please connect and retry.")
+            sys.exit(1)
+    return wait
 
 def get_youtube_url():
     """Get and validate YouTube URL from user."""
@@ -115,9 +136,10 @@ def download_video(url, format_type, is_audio, resolution):
 def main():
     print("🎥 YouTube Downloader 🎵")
     check_dependencies()
-    check_internet()
+    wait_for_internet = check_internet()
     url = get_youtube_url()
     format_type, is_audio, resolution = choose_format()
+    wait_for_internet()
     download_video(url, format_type, is_audio, resolution)
 
 if __name__ == '__main__':
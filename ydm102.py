@@ -1,34 +1,56 @@
 import os
-import subprocess
 import sys
 import re
-import time
-import requests
+import shutil
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, parse_qs
 
+from ydm_retry import run_with_retry
+from ydm_store import profile_key, store_template, store_args, link_playlist
+
+# Set YDM_CHECK_INTERNET=0 to skip the connectivity check.
+CHECK_INTERNET = os.environ.get("YDM_CHECK_INTERNET", "1") != "0"
+
 def check_dependencies():
-    """Check if required dependencies are installed."""
+    """Check if required dependencies are installed (looked up in parallel)."""
     print("🔍 Checking dependencies...")
     dependencies = ['yt-dlp', 'ffmpeg', 'aria2c']
-    missing = []
-    for dep in dependencies:
-        command = 'where' if os.name == 'nt' else 'which'
-        if subprocess.call([command, dep], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT) != 0:
-            missing.append(dep)
+    with ThreadPoolExecutor(len(dependencies)) as pool:
+        found = list(pool.map(shutil.which, dependencies))
+    missing = [dep for dep, path in zip(dependencies, found) if not path]
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}. Install them first.")
         sys.exit(1)
     print("✅ All dependencies found.")
 
 def check_internet():
-    """Verify internet connectivity."""
-    print("🌐 Checking internet...")
-    try:
-        requests.get("https://www.google.com", timeout=5)
-        print("✅ Connected!")
-    except requests.ConnectionError:
-        print("❌ No internet. Please connect and retry.")
-        sys.exit(1)
+    """Start a connectivity check in the background.
+
+    Returns a function that waits for the result and exits if offline, so
+    the check runs while the user is typing the link.
+    """
+    if not CHECK_INTERNET:
+        return lambda: None
+    result = {}
+
+    def probe():
+        try:
+            socket.create_connection(("www.google.com", 443), timeout=5).close()
+            result["ok"] = True
+        except OSError:
+            result["ok"] = False
+
+    thread = threading.Thread(target=probe, daemon=True)
+    thread.start()
+
+    def wait():
+        thread.join()
+        if not result["ok"]:
+            print("❌ No internet. Please connect and retry.")
+            sys.exit(1)
+    return wait
 
 def get_youtube_url():
     """Get and validate YouTube URL from user."""
@@ -83,26 +105,11 @@ def choose_format(is_playlist_flag):
     
     return format_type, is_audio, resolution, download_playlist
 
-def download_with_retry(command):
-    """Download with retries on failure."""
-    retries = 5
-    delay = 1
-    for attempt in range(retries):
-        print(f"⏳ Attempt {attempt + 1}/{retries}...")
-        try:
-            with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
-                for line in proc.stdout:
-                    print(line, end='')
-                proc.wait()
-                if proc.returncode == 0:
-                    return
-                raise subprocess.CalledProcessError(proc.returncode, command)
-        except subprocess.CalledProcessError:
-            print(f"\n❌ Failed. Retrying in {delay}s...")
-            time.sleep(delay)
-            delay *= 2
-    print(f"❌ Failed after {retries} tries.")
-    sys.exit(1)
+def download_with_retry(command, url):
+    """Download with per-failure-class retries that resume partial files."""
+    ok, _ = run_with_retry(command, url)
+    if not ok:
+        sys.exit(1)
 
 def download_video(url, format_type, is_audio, resolution, download_playlist):
     """Handle the download process, including playlist handling for audio."""
@@ -114,8 +121,8 @@ def download_video(url, format_type, is_audio, resolution, download_playlist):
     
     if is_audio:
         if download_playlist:
-            # Save playlist audios in a folder named after the playlist
-            output_template = os.path.join(audio_dir, '%(playlist_title)s', '%(title)s.%(ext)s')
+            # Store each track once; the playlist folder gets links to it
+            output_template = store_template(profile_key(format_type, 'mp3'))
         else:
             # Save single audio directly in YouTube Music
             output_template = os.path.join(audio_dir, '%(title)s.%(ext)s')
@@ -123,7 +130,7 @@ def download_video(url, format_type, is_audio, resolution, download_playlist):
         # Save video directly in YouTube Videos
         output_template = os.path.join(video_dir, '%(title)s.%(ext)s')
     
-    external_downloader_args = '--split=4 --max-connection-per-server=4 --min-split-size=1M'
+    external_downloader_args = '--split=4 --max-connection-per-server=4 --min-split-size=1M --continue=true'
     
     command = [
         'yt-dlp',
@@ -132,14 +139,15 @@ def download_video(url, format_type, is_audio, resolution, download_playlist):
         '-o', output_template,
         '--external-downloader', 'aria2c',
         '--external-downloader-args', external_downloader_args,
-        url
     ]
     
     if is_audio and download_playlist:
         command.append('--yes-playlist')
+        command.extend(store_args(profile_key(format_type, 'mp3')))
     
     if is_audio:
         command.extend(['--extract-audio', '--audio-format', 'mp3'])
+    command.append(url)  # the retry engine expects the URL last
     
     if is_audio:
         if download_playlist:
@@ -149,16 +157,19 @@ def download_video(url, format_type, is_audio, resolution, download_playlist):
     else:
         print(f"📹 Downloading video - {resolution}p...")
 
-    download_with_retry(command)
+    download_with_retry(command, url)
+    if is_audio and download_playlist:
+        output_template = link_playlist(url, profile_key(format_type, 'mp3'), audio_dir)
     print(f"\n✅ Done! Saved to: {output_template}")
 
 def main():
     print("🎥 YouTube Downloader 🎵")
     check_dependencies()
-    check_internet()
+    wait_for_internet = check_internet()
     url = get_youtube_url()
     is_playlist_flag = is_playlist(url)
     format_type, is_audio, resolution, download_playlist = choose_format(is_playlist_flag)
+    wait_for_internet()
     download_video(url, format_type, is_audio, resolution, download_playlist)
 
 if __name__ == '__main__':
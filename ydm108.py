@@ -7,6 +7,11 @@ import shutil
 import json
 from urllib.parse import urlparse, parse_qs
 
+from ydm_limits import JobSlot
+from ydm_retry import run_with_retry
+from ydm_plan import plan
+from ydm_store import profile_key, store_template, store_args, link_playlist
+
 LOG_PATH = os.path.expanduser("~/Downloads/yt_incomplete.log")
 
 def get_youtube_url():
@@ -71,8 +76,9 @@ def get_video_info(url):
     return "Unknown Title"
 
 
-def log_unfinished_download(url, title, resolution):
-    data = {"url": url, "title": title, "resolution": resolution, "timestamp": time.ctime()}
+def log_unfinished_download(url, title, resolution, retry_state=None):
+    data = {"url": url, "title": title, "resolution": resolution, "timestamp": time.ctime(),
+            "retry_state": retry_state or {}}
     with open(LOG_PATH, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
     print(f"📝 Logged unfinished download: {title}")
@@ -100,52 +106,70 @@ def remove_unfinished_log():
         os.remove(LOG_PATH)
 
 
-def download_with_retry(command, url, title, resolution):
-    retries = 5
-    delay = 1
-    for attempt in range(retries):
-        print(f"⏳ Attempt {attempt + 1}/{retries}...")
-        try:
-            with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
-                for line in proc.stdout:
-                    print(line, end="")
-                proc.wait()
-
-                if proc.returncode == 0:
-                    return True  # success
-                raise subprocess.CalledProcessError(proc.returncode, command)
-        except FileNotFoundError:
-            print("❌ yt-dlp or aria2c not found. Please install them or ensure they’re in PATH.")
-            sys.exit(1)
-        except subprocess.CalledProcessError:
-            print(f"\n❌ Failed. Retrying in {delay}s...")
-            time.sleep(delay)
-            delay *= 2
-    print("❌ Failed after 5 tries.")
-    log_unfinished_download(url, title, resolution)
+def with_rate_limit(command, rate):
+    """Copy of the yt-dlp command capped at `rate` bytes/s (0 = unlimited)."""
+    if not rate:
+        return command
+    command = command[:-1] + ["--limit-rate", str(rate), command[-1]]
+    if "--external-downloader-args" in command:
+        i = command.index("--external-downloader-args") + 1
+        command[i] += f" --max-overall-download-limit={rate}"
+    return command
+
+
+def with_connections(command, conns):
+    """Copy of the yt-dlp command with aria2c limited to `conns` connections."""
+    if not conns or "--external-downloader-args" not in command:
+        return command
+    command = list(command)
+    i = command.index("--external-downloader-args") + 1
+    command[i] = command[i].replace("--split=4 --max-connection-per-server=4",
+                                    f"--split={conns} --max-connection-per-server={conns}")
+    return command
+
+
+def download_with_retry(command, url, title, resolution, slot=None, retry_state=None):
+    """Run yt-dlp through the retry engine; failures resume instead of restarting."""
+    def prepare(cmd):
+        # Shares are re-read per attempt; a running yt-dlp keeps its limits.
+        rate = slot.bandwidth_share() if slot else 0
+        conns = slot.connection_share() if slot else 0
+        return with_connections(with_rate_limit(cmd, rate), conns)
+
+    retry_state = retry_state if retry_state is not None else {}
+    success, failure = run_with_retry(command, url, retry_state, prepare)
+    if success:
+        return True
+    if failure == "missing_tool":
+        sys.exit(1)
+    log_unfinished_download(url, title, resolution, retry_state)
     return False
 
 
-def download_video(url, format_type, is_audio, resolution, download_playlist):
+def download_video(url, format_type, is_audio, resolution, download_playlist, retry_state=None):
     print("\n🚀 Preparing to download...")
     video_dir = os.path.expanduser('~/Downloads/YouTube Videos')
     audio_dir = os.path.expanduser('~/Downloads/YouTube Music')
     os.makedirs(video_dir, exist_ok=True)
     os.makedirs(audio_dir, exist_ok=True)
 
-    output_template = os.path.join(
-        audio_dir if is_audio else video_dir,
-        '%(playlist_title)s/%(title)s.%(ext)s' if is_audio and download_playlist else '%(title)s.%(ext)s'
-    )
+    # Playlist tracks go to the shared store once; playlist folders get links
+    store_profile = profile_key(format_type, "mp3") if is_audio and download_playlist else None
+    if store_profile:
+        output_template = store_template(store_profile)
+    else:
+        output_template = os.path.join(audio_dir if is_audio else video_dir, '%(title)s.%(ext)s')
 
     title = get_video_info(url)
 
     command = [sys.executable, "-m", "yt_dlp", "-f", format_type, "--embed-thumbnail", "-o", output_template]
+    if store_profile:
+        command += store_args(store_profile)
 
     if shutil.which("aria2c"):
         command += ["--external-downloader", "aria2c",
                     "--external-downloader-args",
-                    "--split=4 --max-connection-per-server=4 --min-split-size=1M"]
+                    "--split=4 --max-connection-per-server=4 --min-split-size=1M --continue=true"]
     else:
         print("⚠️ aria2c not found. Using yt-dlp internal downloader.")
 
@@ -159,13 +183,23 @@ def download_video(url, format_type, is_audio, resolution, download_playlist):
 
     command.append(url)
 
-    success = download_with_retry(command, url, title, resolution)
+    aria2_conns = 4 if "--external-downloader-args" in command else 0
+    with JobSlot("ydm108", "googlevideo.com", aria2_conns) as slot:
+        success = download_with_retry(command, url, title, resolution, slot, retry_state)
     if success:
+        if store_profile:
+            output_template = link_playlist(url, store_profile, audio_dir, [sys.executable, "-m", "yt_dlp"])
         print(f"\n✅ Done! Saved to: {output_template}")
         remove_unfinished_log()
 
 
 def main():
+    if len(sys.argv) in (3, 4) and sys.argv[1] == "--plan":
+        # --plan URL [1080|720|480|audio]
+        resolution = sys.argv[3] if len(sys.argv) == 4 else "1080"
+        plan(sys.argv[2], 'bestaudio' if resolution == "audio" else f'bestvideo[height<={resolution}]+bestaudio')
+        return
+
     print("🎥 YouTube Downloader 🎵 (Smart Resume Edition)")
 
     previous = check_previous_unfinished()
@@ -174,7 +208,8 @@ def main():
                        f'bestvideo[height<={previous["resolution"]}]+bestaudio' if previous["resolution"] else 'bestaudio',
                        previous["resolution"] is None,
                        previous["resolution"],
-                       False)
+                       False,
+                       previous.get("retry_state"))
         return
 
     while True:
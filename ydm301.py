@@ -2,13 +2,73 @@
 import os
 import sys
 import json
+import time
+import errno
+import hashlib
 import shutil
 import subprocess
 import platform
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, parse_qs
 
+from ydm_limits import JobSlot
+from ydm_plan import SYNC_PATH, plan, throughput_hook, list_entries, estimate_size, human_size
+from ydm_integrity import record as record_hash
+from ydm_queue import SQLiteQueue, run_worker
+
 LOG_PATH = os.path.expanduser("~/Downloads/yt_incomplete.log")
 USE_MODULE = False
+YOUTUBE_CDN = "googlevideo.com"
+ARIA2_CONNECTIONS = 4  # asked for per job; the shared per-host budget may grant fewer
+
+# smallest    → fewest bytes at the chosen height
+# no-reencode → fewest post-processing steps (progressive > same-container pair)
+# efficient   → prefer AV1, then VP9, then H.264, then fewest bytes
+FORMAT_POLICIES = ("smallest", "no-reencode", "efficient")
+FORMAT_POLICY = os.environ.get("YDM_FORMAT_POLICY", "smallest")
+MERGE_CONTAINER = os.environ.get("YDM_MERGE_CONTAINER", "mp4")
+STATS_PATH = os.path.expanduser("~/Downloads/yt_postprocess_stats.jsonl")
+
+# Fast local directory (tmpfs, NVMe) for .part files, fragments and ffmpeg
+# intermediates; only finished files are moved into the library.
+SCRATCH_DIR = os.environ.get("YDM_SCRATCH_DIR", "")
+SCRATCH_HEADROOM = 2.5  # fragments + merged output + ffmpeg temp file
+LIBRARY_HEADROOM = 1.1  # size estimates are approximate
+# Audio jobs have no format plan; their size comes from durations (kbit/s).
+NATIVE_AUDIO_KBPS = 160  # bestaudio: Opus ~130-160, AAC 128
+MP3_KBPS = 245  # libmp3lame -q:a 0
+
+# aria2c reserves the whole file up front where posix_fallocate exists.
+ARIA2_ALLOCATION = "--file-allocation=falloc" if hasattr(os, "posix_fallocate") else "--file-allocation=trunc"
+
+THUMB_CACHE_DIR = os.path.expanduser("~/.cache/ydm/thumbnails")
+THUMB_CACHE_MAX_MB = int(os.environ.get("YDM_THUMB_CACHE_MB", "200"))
+THUMB_MAX_SIZE = 600  # px, longest edge of the cached cover
+
+# Native audio keeps the source stream; NATIVE_AUDIO_CONTAINERS picks its file type.
+NATIVE_AUDIO_FORMAT = "bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best"
+# Stream-copy target per source codec: (extension, ffmpeg muxer). The last
+# fallbacks above can return anything, which only Matroska takes as is.
+NATIVE_AUDIO_CONTAINERS = {
+    "opus": ("opus", "opus"),
+    "vorbis": ("ogg", "ogg"),
+    "mp3": ("mp3", "mp3"),
+    "mp4a": ("m4a", "ipod"),
+    "aac": ("m4a", "ipod"),
+}
+NATIVE_AUDIO_FALLBACK = ("mka", "matroska")
+OGG_EXTS = ("opus", "ogg")
+
+# Playlist entries extracted ahead of the one downloading, and the signed-URL
+# lifetime a prefetched entry must still have left to be used.
+PREFETCH_DEPTH = int(os.environ.get("YDM_PREFETCH", "3"))
+PREFETCH_MIN_TTL = 1800  # seconds
+
+# --sync cursors live in ydm_plan.SYNC_PATH, which --plan reads as its archive.
+SYNC_RESOLUTION = os.environ.get("YDM_SYNC_RESOLUTION", "1080")
+SYNC_KNOWN_STREAK = 3  # known entries in a row that end the scan (pinned/reordered videos)
+SYNC_SEEN_KEEP = 500
 
 
 # ==========================================================
@@ -16,11 +76,12 @@ USE_MODULE = False
 # ==========================================================
 def setup_yt_dlp():
     global USE_MODULE
-    try:
-        import yt_dlp
+    # find_spec locates yt_dlp without importing it; the import (~100 ms)
+    # happens on first use, after the menu.
+    if importlib.util.find_spec("yt_dlp"):
         USE_MODULE = True
         print("✅ Using yt-dlp Python module.")
-    except ImportError:
+    else:
         if shutil.which("yt-dlp"):
             USE_MODULE = False
             print("✅ Using system yt-dlp executable.")
@@ -94,20 +155,432 @@ def choose_format(has_playlist):
     print("[2] Video 720p (Good)")
     print("[3] Video 480p (Fine)")
     print("[4] Audio MP3 (with thumbnail)")
+    print("[5] Audio original Opus/AAC (no re-encode, with thumbnail)")
 
     while True:
-        c = input("🎯 Select (1–4): ").strip()
-        if c in {"1", "2", "3", "4"}:
+        c = input("🎯 Select (1–5): ").strip()
+        if c in {"1", "2", "3", "4", "5"}:
             break
 
-    if c == "4":
+    if c in {"4", "5"}:
         playlist = False
         if has_playlist:
             playlist = input("Download full playlist? (y/n): ").lower() == "y"
-        return "bestaudio/best", True, None, playlist
+        sections = None if playlist else choose_sections()
+        if c == "5":
+            return NATIVE_AUDIO_FORMAT, True, None, playlist, "native", sections
+        return "bestaudio/best", True, None, playlist, "mp3", sections
 
     res = {"1": "1080", "2": "720", "3": "480"}[c]
-    return f"bv*[height<={res}]+ba/b", False, res, False
+    return f"bv*[height<={res}]+ba/b", False, res, False, None, choose_sections()
+
+
+# ==========================================================
+# Time ranges
+# ==========================================================
+def parse_timestamp(text):
+    """'1:02:03', '62:03' or '3723.5' → seconds."""
+    seconds = 0.0
+    for part in text.strip().split(":"):
+        try:
+            seconds = seconds * 60 + float(part)
+        except ValueError:
+            raise ValueError(f"'{text.strip()}' is not a time (use h:mm:ss, m:ss or seconds)") from None
+    return seconds
+
+
+def parse_sections(text):
+    """'0:10-0:20, 1:00:00-1:05:00' → sorted [[start, end], ...] with overlaps merged."""
+    ranges = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        start, dash, end = part.partition("-")
+        if not (dash and start.strip() and end.strip()):
+            # Open ranges would need the duration here, and %(section_end)d cannot print infinity
+            raise ValueError(f"range '{part}' needs a start and an end, e.g. 1:00-2:30")
+        start, end = parse_timestamp(start), parse_timestamp(end)
+        if end <= start:
+            raise ValueError(f"range '{part}' ends before it starts")
+        ranges.append([start, end])
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def choose_sections():
+    """Optional time ranges; only the fragments covering them are fetched.
+
+    Returns None for the whole video, else {"ranges": [[start, end], ...],
+    "keyframes": bool}. Without keyframe cutting the edges snap to the
+    nearest keyframe and nothing is re-encoded.
+    """
+    while True:
+        text = input("⏱️ Time ranges (e.g. 1:00:00-1:05:00, 2:10:00-2:12:30; Enter = whole): ").strip()
+        if not text:
+            return None
+        try:
+            ranges = parse_sections(text)
+            break
+        except ValueError as e:
+            print(f"❌ {e}")
+    keyframes = input("Frame-accurate cuts? Re-encodes the edges, slower (y/n): ").lower() == "y"
+    return {"ranges": ranges, "keyframes": keyframes}
+
+
+# ==========================================================
+# Format planner
+# ==========================================================
+CODEC_RANK = {"av01": 0, "vp09": 1, "vp9": 1, "avc1": 2, "h264": 2}
+
+# Codecs each container accepts by pure stream copy. Opus in mp4 and VP9 in
+# mp4 are left out on purpose: older ffmpeg builds refuse or re-encode them.
+CONTAINER_CODECS = {
+    "mp4": ({"avc1", "h264", "av01", "hvc1", "hev1"}, {"mp4a", "aac"}),
+    "webm": ({"vp8", "vp9", "vp09", "av01"}, {"opus", "vorbis"}),
+    "mkv": (None, None),
+}
+
+
+def extract_info(url):
+    """Metadata for a single video, without downloading anything.
+
+    The module path returns the unprocessed result (formats listed, none
+    selected) so download_media can hand it to process_ie_result as is.
+    """
+    try:
+        if USE_MODULE:
+            import yt_dlp
+            with yt_dlp.YoutubeDL({"quiet": True, "noplaylist": True}) as ydl:
+                return ydl.extract_info(url, download=False, process=False)
+        out = subprocess.run(["yt-dlp", "-J", "--no-playlist", url],
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out)
+    except Exception as e:
+        print(f"⚠️ Could not read formats ({e}).")
+        return None
+
+
+def codec_family(codec):
+    return (codec or "").split(".")[0]
+
+
+def codec_rank(f):
+    return CODEC_RANK.get(codec_family(f.get("vcodec")), 3)
+
+
+def copy_container(video, audio, preferred=MERGE_CONTAINER):
+    """First container (preferred one first) that takes both streams by stream copy."""
+    order = [preferred] + [c for c in CONTAINER_CODECS if c != preferred]
+    for container in order:
+        vcodecs, acodecs = CONTAINER_CODECS.get(container, (None, None))
+        if vcodecs is not None and codec_family(video.get("vcodec")) not in vcodecs:
+            continue
+        if acodecs is not None and codec_family(audio.get("acodec")) not in acodecs:
+            continue
+        return container
+    return "mkv"
+
+
+def format_candidates(info, max_height):
+    """Every progressive format and video+audio pair at the best height ≤ max_height.
+
+    merge_steps is 0 for a progressive format, 1 for a pair that stream-copies
+    into MERGE_CONTAINER and 2 for a pair that has to fall back to another
+    container.
+    """
+    formats = info.get("formats") or []
+    duration = info.get("duration")
+    has_video = lambda f: f.get("vcodec") not in (None, "none") and f.get("height")
+    has_audio = lambda f: f.get("acodec") not in (None, "none")
+
+    videos = [f for f in formats if has_video(f) and f["height"] <= max_height]
+    if not videos:
+        return []
+    height = max(f["height"] for f in videos)
+    videos = [f for f in videos if f["height"] == height]
+    audios = [f for f in formats if has_audio(f) and not has_video(f)]
+
+    candidates = []
+    for v in videos:
+        label = f"{height}p {codec_family(v.get('vcodec'))}"
+        if has_audio(v):
+            candidates.append({
+                "selector": v["format_id"],
+                "bytes": estimate_size(v, duration),
+                "merge_steps": 0,
+                "codec_rank": codec_rank(v),
+                "container": None,
+                "label": f"{label} progressive {v.get('ext')}",
+            })
+            continue
+        for a in audios:
+            container = copy_container(v, a)
+            video_bytes, audio_bytes = estimate_size(v, duration), estimate_size(a, duration)
+            candidates.append({
+                "selector": f"{v['format_id']}+{a['format_id']}",
+                # One unknown side makes the pair unknown; half a size must not win
+                "bytes": video_bytes + audio_bytes if video_bytes and audio_bytes else 0,
+                "merge_steps": 1 if container == MERGE_CONTAINER else 2,
+                "codec_rank": codec_rank(v),
+                "container": container,
+                "label": f"{label} + {codec_family(a.get('acodec'))} → {container}",
+            })
+    return candidates
+
+
+def plan_format(info, max_height, policy=FORMAT_POLICY):
+    """Pick the cheapest candidate under the given policy, or None when nothing fits.
+
+    Candidates with unknown size sort last so an estimate is never a guess.
+    """
+    candidates = format_candidates(info, max_height)
+    if not candidates:
+        return None
+
+    def size_key(c):
+        return c["bytes"] if c["bytes"] else float("inf")
+
+    if policy == "no-reencode":
+        key = lambda c: (c["merge_steps"], size_key(c))
+    elif policy == "efficient":
+        key = lambda c: (c["codec_rank"], size_key(c))
+    else:
+        key = lambda c: (size_key(c), c["merge_steps"])
+
+    return min(candidates, key=key)
+
+
+def plan_video_format(url, fallback, resolution):
+    """Replace a height selector with a concrete plan for this video.
+
+    Returns (format selector, merge container, estimated bytes, info); the
+    container lists mkv as a last resort so yt-dlp never re-encodes. Pass
+    info on to download_media so the video is not extracted twice.
+    """
+    policy = FORMAT_POLICY
+    if policy not in FORMAT_POLICIES:
+        print(f"⚠️ Unknown YDM_FORMAT_POLICY '{policy}', using 'smallest'.")
+        policy = "smallest"
+
+    info = extract_info(url)
+    plan = plan_format(info, int(resolution), policy) if info else None
+    if not plan:
+        return fallback, f"{MERGE_CONTAINER}/mkv", 0, info
+
+    estimate = human_size(plan["bytes"]) if plan["bytes"] else "unknown size"
+    print(f"📐 Plan ({policy}): {plan['label']} → ~{estimate} [{plan['selector']}]")
+    container = plan["container"] or MERGE_CONTAINER
+    return f"{plan['selector']}/{fallback}", f"{container}/mkv", plan["bytes"], info
+
+
+# ==========================================================
+# Post-processing stats
+# ==========================================================
+def postprocessor_stats_hook():
+    """yt-dlp postprocessor hook that records time and bytes rewritten per step.
+
+    Every finished postprocessor (Merger, ExtractAudio, EmbedThumbnail, ...)
+    appends one JSON line to STATS_PATH so full-file rewrites are visible.
+    """
+    started = {}
+
+    def hook(d):
+        info = d.get("info_dict") or {}
+        key = (info.get("id"), d.get("postprocessor"))
+        if d.get("status") == "started":
+            started[key] = time.monotonic()
+        elif d.get("status") == "finished" and key in started:
+            elapsed = time.monotonic() - started.pop(key)
+            path = info.get("filepath") or ""
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            record = {
+                "id": info.get("id"),
+                "postprocessor": d.get("postprocessor"),
+                "seconds": round(elapsed, 3),
+                "bytes_rewritten": size,
+                "file": path,
+                "timestamp": time.ctime(),
+            }
+            with open(STATS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            print(f"\n⏱️ {record['postprocessor']}: {elapsed:.1f}s, {human_size(size)} rewritten")
+
+    return hook
+
+
+# ==========================================================
+# Thumbnail cache
+# ==========================================================
+class ThumbnailCache:
+    """Content-addressed cache of converted, resized cover JPEGs.
+
+    index.json maps sha256(url) to sha256(image bytes); covers are stored as
+    <content hash>.jpg, so playlist entries that share artwork under
+    different URLs share one file. Files are touched on every hit and the
+    least recently used ones are evicted once the cache exceeds its size.
+    """
+
+    def __init__(self, root=THUMB_CACHE_DIR, max_bytes=THUMB_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _save_index(self):
+        with open(self.index_path, "w") as f:
+            json.dump(self.index, f)
+
+    def lookup(self, url):
+        content_hash = self.index.get(hashlib.sha256(url.encode()).hexdigest())
+        path = content_hash and os.path.join(self.root, content_hash + ".jpg")
+        if path and os.path.exists(path):
+            os.utime(path)
+            return path
+        return None
+
+    def store(self, url, data, ffmpeg):
+        """Convert raw image bytes to a resized JPEG, file it and return its path."""
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, content_hash + ".jpg")
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            scale = f"scale='min({THUMB_MAX_SIZE},iw)':'min({THUMB_MAX_SIZE},ih)':force_original_aspect_ratio=decrease"
+            subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", "pipe:0", "-vf", scale,
+                            "-frames:v", "1", "-c:v", "mjpeg", "-f", "image2", path + ".part"],
+                           input=data, check=True)
+            os.replace(path + ".part", path)
+        self.index[hashlib.sha256(url.encode()).hexdigest()] = content_hash
+        self._save_index()
+        self.evict()
+        return path
+
+    def evict(self):
+        covers = [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith(".jpg")]
+        covers.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(c) for c in covers)
+        evicted = set()
+        while covers and total > self.max_bytes:
+            oldest = covers.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+            evicted.add(os.path.basename(oldest)[:-4])
+        if evicted:
+            self.index = {k: v for k, v in self.index.items() if v not in evicted}
+            self._save_index()
+
+    def cover_for(self, info, ydl, ffmpeg):
+        """Cached JPEG cover for a video, fetching and converting it only on a miss."""
+        thumbnails = [t for t in info.get("thumbnails") or [] if t.get("url")]
+        url = info.get("thumbnail") or (thumbnails[-1]["url"] if thumbnails else None)
+        if not url:
+            return None
+        path = self.lookup(url)
+        if path:
+            return path
+        try:
+            data = ydl.urlopen(url).read()
+            return self.store(url, data, ffmpeg)
+        except Exception as e:
+            print(f"⚠️ Could not fetch thumbnail ({e}).")
+            return None
+
+
+# ==========================================================
+# Single-pass audio finalization
+# ==========================================================
+def track_tags(info):
+    tags = {
+        "title": info.get("track") or info.get("title"),
+        "artist": info.get("artist") or info.get("uploader"),
+        "album": info.get("album"),
+        "date": (info.get("upload_date") or "")[:4],
+        "comment": info.get("webpage_url"),
+    }
+    return {k: v for k, v in tags.items() if v}
+
+
+def embed_ogg_cover(path, thumb):
+    """Add a cover to an .opus/.ogg file in place (ogg cannot carry an attached_pic stream)."""
+    try:
+        import base64
+        from mutagen.flac import Picture
+        from mutagen.oggopus import OggOpus
+        from mutagen.oggvorbis import OggVorbis
+    except ImportError:
+        print(f"⚠️ mutagen not installed; {os.path.basename(path)} saved without cover.")
+        return
+    picture = Picture()
+    picture.type = 3
+    picture.mime = "image/jpeg"
+    with open(thumb, "rb") as f:
+        picture.data = f.read()
+    audio = OggOpus(path) if path.endswith(".opus") else OggVorbis(path)
+    audio["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    audio.save()
+
+
+def single_pass_audio_pp(ffmpeg, audio_codec):
+    """yt-dlp postprocessor that writes the final tagged file in one ffmpeg run.
+
+    Replaces the FFmpegExtractAudio → EmbedThumbnail → FFmpegMetadata chain,
+    where each step rewrites the whole file: the audio is encoded (or stream
+    copied), the cached JPEG cover attached and the tags written together.
+    """
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class SinglePassAudioPP(PostProcessor):
+        def run(self, info):
+            source = info["filepath"]
+            thumb = ThumbnailCache().cover_for(info, self._downloader, ffmpeg)
+
+            if audio_codec == "mp3":
+                (ext, muxer), codec_args = ("mp3", "mp3"), ["-c:a", "libmp3lame", "-q:a", "0"]
+            else:
+                ext, muxer = NATIVE_AUDIO_CONTAINERS.get(codec_family(info.get("acodec")), NATIVE_AUDIO_FALLBACK)
+                codec_args = ["-c:a", "copy"]
+            if ext == "mp3":
+                codec_args += ["-id3v2_version", "3"]
+
+            final = os.path.splitext(source)[0] + "." + ext
+            target = final + ".part" if final == source else final
+
+            cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", source]
+            cover_in_pass = thumb and ext not in OGG_EXTS
+            if cover_in_pass and ext == "mka":
+                cmd += ["-map", "0:a", "-attach", thumb,
+                        "-metadata:s:t", "mimetype=image/jpeg", "-metadata:s:t", "filename=cover.jpg"]
+            elif cover_in_pass:
+                cmd += ["-i", thumb, "-map", "0:a", "-map", "1:v", "-c:v", "copy",
+                        "-disposition:v", "attached_pic",
+                        "-metadata:s:v", "title=Album cover",
+                        "-metadata:s:v", "comment=Cover (front)"]
+            else:
+                cmd += ["-map", "0:a"]
+            cmd += codec_args
+            for key, value in track_tags(info).items():
+                cmd += ["-metadata", f"{key}={value}"]
+            cmd += ["-f", muxer, target]
+
+            self.to_screen(f"Finalizing {final}")
+            subprocess.run(cmd, check=True)
+            if target != final:
+                os.replace(target, final)
+            if thumb and not cover_in_pass:
+                embed_ogg_cover(final, thumb)
+
+            info.update({"filepath": final, "ext": ext})
+            return [source] if source != final else [], info
+
+    return SinglePassAudioPP()
 
 
 # ==========================================================
@@ -134,10 +607,162 @@ def clear_resume():
         os.remove(LOG_PATH)
 
 
+# ==========================================================
+# Scratch staging
+# ==========================================================
+def pick_work_dir(out_dir, expected_bytes=0):
+    """Scratch dir when configured and big enough for the job, else the library."""
+    if not SCRATCH_DIR:
+        return out_dir
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    free = shutil.disk_usage(SCRATCH_DIR).free
+    if expected_bytes and free < expected_bytes * SCRATCH_HEADROOM:
+        print(f"⚠️ Scratch has {human_size(free)} free, job needs ~{human_size(expected_bytes * SCRATCH_HEADROOM)}; "
+              f"working in the library instead.")
+        return out_dir
+    return SCRATCH_DIR
+
+
+def preflight(expected_bytes, out_dir, work_dir):
+    """Check that the job fits on the library and scratch volumes before starting.
+
+    Needs are summed per device, so a scratch dir on the library volume is
+    counted against the same free space.
+    """
+    if not expected_bytes:
+        return True
+    targets = [(out_dir, LIBRARY_HEADROOM)]
+    if work_dir != out_dir:
+        targets.append((work_dir, SCRATCH_HEADROOM))
+    needs = {}
+    for path, headroom in targets:
+        device = os.stat(path).st_dev
+        free, need = needs.get(device, (shutil.disk_usage(path).free, 0))
+        needs[device] = (free, need + expected_bytes * headroom)
+    for free, need in needs.values():
+        if free < need:
+            print(f"❌ Not enough disk space: ~{human_size(need)} needed, {human_size(free)} free.")
+            return False
+    return True
+
+
+def listing_durations(url):
+    """Durations in seconds of every entry of a flat playlist listing (0 = unknown)."""
+    if USE_MODULE:
+        import yt_dlp
+        with yt_dlp.YoutubeDL({"quiet": True, "extract_flat": "in_playlist"}) as ydl:
+            info = ydl.extract_info(url, download=False)
+        return [e.get("duration") or 0 for e in info.get("entries") or [] if e]
+    out = subprocess.run(["yt-dlp", "--flat-playlist", "--print", "%(duration)s", url],
+                         capture_output=True, text=True, check=True).stdout
+    return [float(d) if d not in ("NA", "None") else 0 for d in out.split()]
+
+
+def plan_audio_size(url, playlist, audio_codec):
+    """(estimated bytes, info) for an audio job, so preflight can check it.
+
+    A playlist is summed from the durations in its flat listing; entries
+    without one count as 0, so the estimate can only be low. A single video
+    is extracted once and its info is passed on to download_media.
+    """
+    rate = (MP3_KBPS if audio_codec == "mp3" else NATIVE_AUDIO_KBPS) * 1000 / 8
+    if playlist:
+        try:
+            return int(sum(listing_durations(url)) * rate), None
+        except Exception as e:
+            print(f"⚠️ Could not list the playlist for a size estimate ({e}).")
+            return 0, None
+    info = extract_info(url)
+    return int(((info or {}).get("duration") or 0) * rate), info
+
+
+def copy_file_data(src, dst):
+    """Kernel-side copy: copy_file_range, then sendfile, then a plain read/write loop."""
+    size = os.fstat(src.fileno()).st_size
+    offset = 0
+    for copy in ("copy_file_range", "sendfile"):
+        if not hasattr(os, copy):
+            continue
+        dst.seek(offset)  # sendfile writes at the current position
+        try:
+            while offset < size:
+                if copy == "copy_file_range":
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), size - offset, offset, offset)
+                else:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            if offset >= size:
+                return
+        except OSError:
+            continue
+    src.seek(offset)
+    dst.seek(offset)
+    shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def move_into_library(path, work_dir, out_dir):
+    """Move a finished file from scratch into the library.
+
+    A rename when both are on one filesystem; otherwise a kernel-side copy to
+    a .part file that is renamed into place, so the library never sees a
+    half-written file.
+    """
+    if work_dir == out_dir or not os.path.exists(path):
+        return path
+    dest = os.path.join(out_dir, os.path.relpath(path, work_dir))
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    try:
+        os.replace(path, dest)
+        return dest
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    temp = dest + ".part"
+    with open(path, "rb") as src, open(temp, "wb") as dst:
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(dst.fileno(), 0, os.fstat(src.fileno()).st_size)
+            except OSError:
+                pass  # filesystem without fallocate support
+        copy_file_data(src, dst)
+    shutil.copystat(path, temp)
+    os.replace(temp, dest)
+    os.remove(path)
+    return dest
+
+
+def library_move_pp(work_dir, out_dir):
+    """Last post_process step: move the finished file into the library.
+
+    yt-dlp's own move from paths["temp"] to paths["home"] is a plain
+    shutil.move; this one goes through move_into_library instead. The file
+    then already sits at its final path, so yt-dlp's move leaves it alone.
+    """
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class LibraryMovePP(PostProcessor):
+        def run(self, info):
+            info["filepath"] = move_into_library(info["filepath"], work_dir, out_dir)
+            return [], info
+
+    return LibraryMovePP()
+
+
 # ==========================================================
 # Download logic (FIXED)
 # ==========================================================
-def download_media(url, fmt, is_audio, resolution, playlist):
+def download_media(url, fmt, is_audio, resolution, playlist, merge_format=None, audio_codec="mp3",
+                   expected_bytes=0, sections=None, track_resume=True, info=None):
+    """Download one URL; returns True on success, False on failure or deferral.
+
+    `info` is metadata already extracted for this URL (see plan_video_format);
+    when given, the download starts from it instead of extracting again.
+
+    Non-interactive callers (--sync, --worker) pass track_resume=False so
+    they neither write nor clear the interactive resume log.
+    """
     video_dir = os.path.expanduser("~/Downloads/YouTube Videos")
     audio_dir = os.path.expanduser("~/Downloads/YouTube Music")
 
@@ -145,98 +770,486 @@ def download_media(url, fmt, is_audio, resolution, playlist):
     os.makedirs(audio_dir, exist_ok=True)
 
     out_dir = audio_dir if is_audio else video_dir
-    outtmpl = os.path.join(out_dir, "%(title)s.%(ext)s")
+    work_dir = pick_work_dir(out_dir, expected_bytes)
+    name = "%(title)s [%(section_start)d-%(section_end)d].%(ext)s" if sections else "%(title)s.%(ext)s"
+
+    meta = {
+        "format": fmt,
+        "audio": is_audio,
+        "resolution": resolution,
+        "playlist": playlist,
+        "merge_format": merge_format,
+        "audio_codec": audio_codec,
+        "expected_bytes": expected_bytes,
+        "sections": sections,
+    }
+    if not preflight(expected_bytes, out_dir, work_dir):
+        if track_resume:
+            log_unfinished(url, meta)
+            print("⏸️ Job deferred; free some space and accept the resume prompt next run.")
+        else:
+            print("⏸️ Job deferred; free some space and run it again.")
+        return False
 
     ffmpeg = ensure_ffmpeg()
     aria2 = get_aria2()
 
+    with JobSlot("ydm301", YOUTUBE_CDN, ARIA2_CONNECTIONS if aria2 else 0) as slot:
+        rate = slot.bandwidth_share()
+        conns = slot.connection_share()
+        try:
+            if USE_MODULE:
+                import yt_dlp
+
+                ydl_opts = {
+                    "format": fmt,
+                    # Existing files are looked up in home, so finished
+                    # downloads are skipped even when staging in scratch.
+                    "paths": {"home": out_dir, "temp": work_dir},
+                    "outtmpl": name,
+                    "noplaylist": not playlist,
+                    "continuedl": True,
+                    "retries": 10,
+                    "quiet": False,
+                    "ffmpeg_location": ffmpeg,
+                    "postprocessor_hooks": [postprocessor_stats_hook()],
+                    "progress_hooks": [throughput_hook("ydm301")],
+                    "ratelimit": rate or None,
+                }
+
+                if merge_format:
+                    ydl_opts["merge_output_format"] = merge_format
+
+                # All ranges come out of one extraction; yt-dlp hands sections
+                # to its ffmpeg downloader, which reads only those fragments.
+                if sections:
+                    from yt_dlp.utils import download_range_func
+                    ydl_opts["download_ranges"] = download_range_func(None, sections["ranges"])
+                    ydl_opts["force_keyframes_at_cuts"] = sections["keyframes"]
+
+                # SAFE aria2 usage (yt-dlp controls auth)
+                if aria2:
+                    ydl_opts["downloader"] = "aria2c"
+                    ydl_opts["downloader_args"] = {
+                        "aria2c": [f"-x{conns}", f"-s{conns}", "-k1M", ARIA2_ALLOCATION,
+                                   f"--max-overall-download-limit={rate}"]
+                    }
+
+                # 🔥 AUDIO FIX (THIS IS THE IMPORTANT PART)
+                # Native audio keeps the downloaded codec (webm → .opus,
+                # mp4 → .m4a); MP3 is encoded. Either way, encode, cover and tags
+                # happen in a single ffmpeg pass instead of three full rewrites.
+                if is_audio:
+                    ydl_opts["prefer_ffmpeg"] = True
+
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    # The native downloader re-reads ratelimit per chunk, so a
+                    # rebalanced share applies mid-transfer; aria2c picks it up
+                    # from the next format or playlist entry it is spawned for.
+                    def apply_share(share):
+                        ydl.params["ratelimit"] = share or None
+                        if aria2:
+                            ydl.params["downloader_args"]["aria2c"][-1] = f"--max-overall-download-limit={share}"
+
+                    def apply_connections(count):
+                        ydl.params["downloader_args"]["aria2c"][:2] = [f"-x{count}", f"-s{count}"]
+
+                    slot.on_change(apply_share)
+                    if aria2:
+                        slot.on_connections_change(apply_connections)
+                    if is_audio:
+                        ydl.add_post_processor(single_pass_audio_pp(ffmpeg, audio_codec), when="post_process")
+                    if work_dir != out_dir:
+                        ydl.add_post_processor(library_move_pp(work_dir, out_dir), when="post_process")
+                    # Hash each finished file once, into its folder's manifest
+                    ydl.add_post_hook(lambda path: record_hash(path, source=url))
+                    if playlist and PREFETCH_DEPTH:
+                        download_playlist(ydl, url)
+                    elif info:
+                        ydl.process_ie_result(info, download=True)
+                    else:
+                        ydl.download([url])
+
+            else:
+                # CLI fallback (also FIXED)
+                cmd = [
+                    "yt-dlp",
+                    "-f", fmt,
+                    "-P", f"home:{out_dir}",
+                    "-P", f"temp:{work_dir}",
+                    "-o", name,
+                    "--continue",
+                    "--retries", "10",
+                    "--add-metadata",
+                    "--embed-thumbnail",
+                ]
+
+                if merge_format:
+                    cmd += ["--merge-output-format", merge_format]
+
+                if sections:
+                    for start, end in sections["ranges"]:
+                        cmd += ["--download-sections", f"*{start}-{end}"]
+                    if sections["keyframes"]:
+                        cmd.append("--force-keyframes-at-cuts")
+
+                if playlist:
+                    cmd.append("--yes-playlist")
+                else:
+                    cmd.append("--no-playlist")
+
+                if aria2:
+                    cmd += [
+                        "--downloader", "aria2c",
+                        "--downloader-args",
+                        f"aria2c:-x{conns} -s{conns} -k1M {ARIA2_ALLOCATION} --max-overall-download-limit={rate}"
+                    ]
+
+                if rate:
+                    cmd += ["--limit-rate", str(rate)]
+
+                if is_audio:
+                    cmd += ["--extract-audio", "--audio-format", "mp3" if audio_codec == "mp3" else "best"]
+
+                if info:
+                    info_path = os.path.join(work_dir, f".{info.get('id', 'video')}.info.json")
+                    with open(info_path, "w", encoding="utf-8") as f:
+                        json.dump(info, f)
+                    cmd += ["--load-info-json", info_path]
+                else:
+                    cmd.append(url)
+                try:
+                    subprocess.check_call(cmd)
+                finally:
+                    if info:
+                        os.remove(info_path)
+
+            if track_resume:
+                clear_resume()
+            print(f"\n✅ Download complete → {out_dir}")
+            return True
+
+        except Exception as e:
+            print(f"\n❌ Download failed: {e}")
+            if track_resume:
+                log_unfinished(url, meta)
+            return False
+
+
+# ==========================================================
+# Playlist metadata prefetch
+# ==========================================================
+def extract_raw(url):
+    """Unprocessed info dict for one video (formats listed, none selected)."""
+    import yt_dlp
+    with yt_dlp.YoutubeDL({"quiet": True, "noplaylist": True}) as ydl:
+        return ydl.extract_info(url, download=False, process=False)
+
+
+def url_expiry(info):
+    """Earliest 'expire=' timestamp among the signed format URLs, or None."""
+    stamps = [int(parse_qs(urlparse(f["url"]).query)["expire"][0])
+              for f in info.get("formats") or []
+              if f.get("url") and "expire" in parse_qs(urlparse(f["url"]).query)]
+    return min(stamps) if stamps else None
+
+
+class MetadataPrefetcher:
+    """Extracts the next `depth` playlist entries while the current one downloads.
+
+    Each extraction uses its own YoutubeDL, since instances are not thread
+    safe. get(i) returns the info dict for entry i, or None when it failed or
+    its URLs expire within PREFETCH_MIN_TTL; the caller then extracts afresh.
+    """
+
+    def __init__(self, urls, depth=PREFETCH_DEPTH):
+        self.urls = urls
+        self.depth = depth
+        self.pool = ThreadPoolExecutor(max(depth, 1))
+        self.futures = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        return False
+
+    def get(self, index):
+        for i in range(index, min(index + self.depth + 1, len(self.urls))):
+            if i not in self.futures:
+                self.futures[i] = self.pool.submit(extract_raw, self.urls[i])
+        try:
+            info = self.futures.pop(index).result()
+        except Exception:
+            return None
+        expiry = url_expiry(info)
+        if expiry and expiry - time.time() < PREFETCH_MIN_TTL:
+            return None
+        return info
+
+
+def download_playlist(ydl, url):
+    """Download a playlist entry by entry with metadata prefetched ahead."""
+    entries = list_entries(url)
+    with MetadataPrefetcher(entries) as prefetcher:
+        for index, entry in enumerate(entries):
+            print(f"\n📃 {index + 1}/{len(entries)}")
+            info = prefetcher.get(index)
+            if info:
+                ydl.process_ie_result(info, download=True)
+            else:
+                ydl.download([entry])
+
+
+# ==========================================================
+# Channel / playlist sync
+# ==========================================================
+def load_sync_state():
     try:
-        if USE_MODULE:
-            import yt_dlp
+        with open(SYNC_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-            ydl_opts = {
-                "format": fmt,
-                "outtmpl": outtmpl,
-                "noplaylist": not playlist,
-                "continuedl": True,
-                "retries": 10,
-                "quiet": False,
-                "ffmpeg_location": ffmpeg,
-            }
 
-            # SAFE aria2 usage (yt-dlp controls auth)
-            if aria2:
-                ydl_opts["downloader"] = "aria2c"
-                ydl_opts["downloader_args"] = {
-                    "aria2c": ["-x4", "-k1M"]
-                }
+def save_sync_state(state):
+    tmp = SYNC_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, SYNC_PATH)
+
+
+def iter_source_entries(url):
+    """Yield (video id, upload date or None) for a channel or playlist, page by page.
+
+    Nothing past the entries actually consumed is requested, so breaking out
+    of the loop stops the enumeration.
+    """
+    if USE_MODULE:
+        import yt_dlp
+        opts = {"quiet": True, "extract_flat": "in_playlist", "lazy_playlist": True}
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            for entry in info.get("entries") or []:
+                if entry and entry.get("id"):
+                    yield entry["id"], entry.get("upload_date")
+        return
+
+    cmd = ["yt-dlp", "--flat-playlist", "--lazy-playlist", "--print", "%(id)s %(upload_date)s", url]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as proc:
+        try:
+            for line in proc.stdout:
+                vid, _, date = line.strip().partition(" ")
+                yield vid, (None if date in ("", "NA") else date)
+        finally:
+            proc.terminate()
+
+
+def find_new_entries(url, cursor):
+    """(id, upload date) pairs newer than the cursor, newest first.
+
+    Channel tabs list uploads newest first, so the scan stops after
+    SYNC_KNOWN_STREAK known IDs in a row or at an upload date older than the
+    cursor's. A source without a cursor is enumerated in full once.
+
+    A list= playlist comes in playlist order and usually grows at the end,
+    so its full flat listing is diffed against the cursor instead.
+    """
+    seen = set(cursor.get("seen", []))
+    if is_playlist(url):
+        new = {}
+        for vid, date in iter_source_entries(url):
+            if vid not in seen:
+                new.setdefault(vid, date)
+        return list(new.items())[::-1]
+
+    newest_date = cursor.get("upload_date")
+    new, streak = {}, 0
+    for vid, date in iter_source_entries(url):
+        if newest_date and date and date < newest_date:
+            break
+        if vid in seen:
+            streak += 1
+            if streak >= SYNC_KNOWN_STREAK:
+                break
+            continue
+        streak = 0
+        new.setdefault(vid, date)
+    return list(new.items())
 
-            # 🔥 AUDIO FIX (THIS IS THE IMPORTANT PART)
-            if is_audio:
-                ydl_opts.update({
-                    "postprocessors": [
-                        {
-                            "key": "FFmpegExtractAudio",
-                            "preferredcodec": "mp3",
-                            "preferredquality": "0",
-                        },
-                        {"key": "EmbedThumbnail"},
-                        {"key": "FFmpegMetadata"},
-                    ],
-                    "writethumbnail": True,
-                    "addmetadata": True,
-                    "prefer_ffmpeg": True,
-                })
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
 
+def sync_source(url, state):
+    """Download what is new on a channel/playlist since the last sync."""
+    cursor = state.setdefault(url, {"seen": [], "pending": []})
+    # A playlist is diffed in full, so every ID it ever had must stay known.
+    keep = None if is_playlist(url) else SYNC_SEEN_KEEP
+    entries = find_new_entries(url, cursor)
+    new = [vid for vid, _ in entries]
+    # Earlier failures stay queued; the scan would stop before reaching them.
+    queue = [vid for vid in cursor.get("pending", []) if vid not in new] + new[::-1]
+    print(f"\n🔄 {url}: {len(new)} new, {len(queue) - len(new)} pending")
+
+    for vid in queue:
+        video_url = f"https://www.youtube.com/watch?v={vid}"
+        fmt, merge_format, expected_bytes, info = plan_video_format(
+            video_url, f"bv*[height<={SYNC_RESOLUTION}]+ba/b", SYNC_RESOLUTION)
+        ok = download_media(video_url, fmt, False, SYNC_RESOLUTION, False, merge_format, None, expected_bytes,
+                            track_resume=False, info=info)
+        cursor["pending"] = [p for p in cursor.get("pending", []) if p != vid]
+        if ok:
+            cursor["seen"] = ([vid] + [s for s in cursor["seen"] if s != vid])[:keep]
         else:
-            # CLI fallback (also FIXED)
-            cmd = [
-                "yt-dlp",
-                "-f", fmt,
-                "-o", outtmpl,
-                "--continue",
-                "--retries", "10",
-                "--add-metadata",
-                "--embed-thumbnail",
-            ]
-
-            if playlist:
-                cmd.append("--yes-playlist")
-            else:
-                cmd.append("--no-playlist")
+            cursor["pending"].append(vid)
+        save_sync_state(state)
 
-            if aria2:
-                cmd += [
-                    "--downloader", "aria2c",
-                    "--downloader-args", "aria2c:-x4 -k1M"
-                ]
+    # Flat listings do not always carry upload dates; then only IDs are used.
+    dates = [date for _, date in entries if date]
+    if dates:
+        cursor["upload_date"] = max(dates + [cursor.get("upload_date") or ""])
+    cursor["synced_at"] = time.ctime()
+    save_sync_state(state)
 
-            if is_audio:
-                cmd += ["--extract-audio", "--audio-format", "mp3"]
 
-            cmd.append(url)
-            subprocess.check_call(cmd)
+def sync_sources(urls):
+    state = load_sync_state()
+    for url in urls:
+        sync_source(url, state)
 
-        clear_resume()
-        print(f"\n✅ Download complete → {out_dir}")
 
-    except Exception as e:
-        print(f"\n❌ Download failed: {e}")
-        log_unfinished(url, {
-            "format": fmt,
-            "audio": is_audio,
-            "resolution": resolution,
-            "playlist": playlist
-        })
+# ==========================================================
+# Shared queue (multi-node)
+# ==========================================================
+def enqueue_urls(url, quality):
+    """Queue a video, or each video of a playlist as its own job so nodes share it."""
+    queue = SQLiteQueue()
+    entries = list_entries(url) if is_playlist(url) else [url]
+    for entry in entries:
+        queue.enqueue(entry, {"quality": quality})
+    print(f"📥 Queued {len(entries)} job(s) → {queue.path}")
+
+
+def queue_job(job):
+    """Worker handler: download one queued video without prompts."""
+    url, quality = job["url"], job["options"].get("quality", "1080")
+    if quality == "audio":
+        expected_bytes, info = plan_audio_size(url, False, "mp3")
+        return download_media(url, "bestaudio/best", True, None, False, None, "mp3", expected_bytes,
+                              track_resume=False, info=info)
+    fmt, merge_format, expected_bytes, info = plan_video_format(url, f"bv*[height<={quality}]+ba/b", quality)
+    return download_media(url, fmt, False, quality, False, merge_format, None, expected_bytes,
+                          track_resume=False, info=info)
+
+
+# ==========================================================
+# Audio path benchmark
+# ==========================================================
+def child_cpu_seconds():
+    try:
+        import resource
+    except ImportError:  # Windows: fall back to wall time
+        return time.perf_counter()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def benchmark_audio_paths(source, runs=3):
+    """Compare ffmpeg CPU time per track: MP3 transcode vs native remux.
+
+    `source` is any downloaded audio file (e.g. a .webm from bestaudio).
+    Outputs go to a temporary directory and are deleted afterwards.
+    """
+    import tempfile
+
+    ffmpeg = ensure_ffmpeg()
+    paths = {
+        "mp3 transcode": ["-vn", "-c:a", "libmp3lame", "-q:a", "0", "out.mp3"],
+        "native remux": ["-vn", "-c:a", "copy", "out.mka"],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, args in paths.items():
+            cpu = []
+            for _ in range(runs):
+                before = child_cpu_seconds()
+                subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", source] + args,
+                               cwd=tmp, check=True)
+                cpu.append(child_cpu_seconds() - before)
+            print(f"{name:>14}: {min(cpu):.2f}s CPU per track (best of {runs})")
+
+
+# ==========================================================
+# Startup benchmark
+# ==========================================================
+STARTUP_BUDGET_MS = 100
+STARTUP_SCRIPTS = ("ydm301", "ydm101", "ydm102", "D4C2")
+
+
+def benchmark_startup(runs=5):
+    """Time each script's import with `python -X importtime` against the budget.
+
+    Reports the best of `runs` cumulative import times for the script module
+    and the three slowest imports it pulled in.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in STARTUP_SCRIPTS:
+        best, rows = None, []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {name}"],
+                                    cwd=here, capture_output=True, text=True)
+            if result.returncode != 0:
+                break
+            # "import time: self [us] | cumulative | imported package"
+            parsed = [(int(cumulative), package.strip())
+                      for _, cumulative, package in (line.split(":", 1)[1].split("|")
+                                                     for line in result.stderr.splitlines()
+                                                     if line.startswith("import time:") and "[us]" not in line)]
+            total = next(us for us, package in parsed if package == name)
+            if best is None or total < best:
+                best, rows = total, parsed
+        if best is None:
+            print(f"{name:>8}: import failed ({result.stderr.strip().splitlines()[-1]})")
+            continue
+        ms = best / 1000
+        slowest = ", ".join(f"{package.strip()} {us / 1000:.0f}ms"
+                            for us, package in sorted(rows, reverse=True)[1:4])
+        verdict = "OK" if ms <= STARTUP_BUDGET_MS else "OVER BUDGET"
+        print(f"{name:>8}: {ms:6.1f} ms / {STARTUP_BUDGET_MS} ms {verdict}  ({slowest})")
 
 
 # ==========================================================
 # Main
 # ==========================================================
 def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--bench-audio":
+        benchmark_audio_paths(sys.argv[2])
+        return
+    if len(sys.argv) == 2 and sys.argv[1] == "--bench-startup":
+        benchmark_startup()
+        return
+    if len(sys.argv) in (3, 4) and sys.argv[1] == "--plan":
+        # --plan URL [1080|720|480|audio]
+        quality = sys.argv[3] if len(sys.argv) == 4 else "1080"
+        plan(sys.argv[2], "bestaudio/best" if quality == "audio" else f"bv*[height<={quality}]+ba/b")
+        return
+    if len(sys.argv) in (3, 4) and sys.argv[1] == "--enqueue":
+        # --enqueue URL [1080|720|480|audio]
+        enqueue_urls(sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else "1080")
+        return
+    if len(sys.argv) == 2 and sys.argv[1] == "--worker":
+        setup_yt_dlp()
+        try:
+            run_worker(SQLiteQueue(), queue_job)
+        except KeyboardInterrupt:
+            print("\n👋 Worker stopped; its job went back to the queue.")
+        return
+    if len(sys.argv) == 2 and sys.argv[1] == "--queue-status":
+        print(SQLiteQueue().counts())
+        return
+    if len(sys.argv) >= 3 and sys.argv[1] == "--sync":
+        setup_yt_dlp()
+        sync_sources(sys.argv[2:])
+        return
+
     setup_yt_dlp()
     print("\n🎬 YouTube Downloader (MP3 Thumbnail FIXED Edition)\n")
 
@@ -247,15 +1260,29 @@ def main():
             resume["format"],
             resume["audio"],
             resume.get("resolution"),
-            resume.get("playlist", False)
+            resume.get("playlist", False),
+            resume.get("merge_format"),
+            resume.get("audio_codec", "mp3"),
+            resume.get("expected_bytes", 0),
+            resume.get("sections"),
         )
         return
 
     while True:
         try:
             url = get_youtube_url()
-            fmt, is_audio, res, playlist = choose_format(is_playlist(url))
-            download_media(url, fmt, is_audio, res, playlist)
+            fmt, is_audio, res, playlist, audio_codec, sections = choose_format(is_playlist(url))
+            merge_format, expected_bytes, info = None, 0, None
+            if res:
+                fmt, merge_format, expected_bytes, info = plan_video_format(url, fmt, res)
+            elif not sections:
+                expected_bytes, info = plan_audio_size(url, playlist, audio_codec)
+                if expected_bytes:
+                    print(f"📏 Estimated size: ~{human_size(expected_bytes)}")
+            if sections:
+                expected_bytes = 0  # the estimate covers the whole video, not the ranges
+            download_media(url, fmt, is_audio, res, playlist, merge_format, audio_codec, expected_bytes,
+                           sections, info=info)
         except KeyboardInterrupt:
             print("\n👋 Exiting.")
             sys.exit(0)
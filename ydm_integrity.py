@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Integrity hashes for downloaded files, kept in a manifest per directory.
+
+Each directory with downloads gets a .ydm_manifest.json that maps file names
+to their BLAKE2b digest, size and source. ytdw.py's native downloader hashes
+bytes as it writes them. Other engines hash the finished file once. A .part
+file also carries a checkpoint (<name>.part.hash) of the bytes written so
+far, so a resume can check the partial data before appending to it.
+
+    python ydm_integrity.py verify DIR [DIR ...]
+
+re-hashes every manifest entry in parallel and checks .part checkpoints.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: best effort without a file lock
+    fcntl = None
+
+MANIFEST_NAME = ".ydm_manifest.json"
+HASH_NAME = "blake2b"
+CHUNK_SIZE = 1024 * 1024
+VERIFY_WORKERS = os.cpu_count() or 4
+
+
+def new_hash():
+    return hashlib.new(HASH_NAME)
+
+
+def hash_file(path, limit=None):
+    """Hex digest of the file, or of its first `limit` bytes, in one sequential pass."""
+    return hash_into(new_hash(), path, limit).hexdigest()
+
+
+def hash_into(digest, path, limit=None):
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest
+
+
+# ==========================================================
+# Manifest
+# ==========================================================
+def update_manifest(directory, change):
+    """Apply `change(entries)` to a directory's manifest under a file lock."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path, "a+", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                entries = json.loads(f.read() or "{}")
+            except ValueError:
+                entries = {}
+            change(entries)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(entries, indent=2))
+            return entries
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def record(path, digest=None, source=""):
+    """Add a finished file to its directory's manifest, hashing it if no digest is given."""
+    digest = digest or hash_file(path)
+    entry = {HASH_NAME: digest, "size": os.path.getsize(path), "source": source, "hashed_at": time.time()}
+    update_manifest(os.path.dirname(os.path.abspath(path)),
+                    lambda entries: entries.__setitem__(os.path.basename(path), entry))
+    return digest
+
+
+# ==========================================================
+# Partial-file checkpoints
+# ==========================================================
+def checkpoint_path(part_path):
+    return part_path + ".hash"
+
+
+def save_checkpoint(part_path, size, digest):
+    """Write the checkpoint atomically; a crash mid-write leaves the old one."""
+    path = checkpoint_path(part_path)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"size": size, HASH_NAME: digest}, f)
+    os.replace(path + ".tmp", path)
+
+
+def resume_point(part_path):
+    """(offset, running hash) to resume a .part file from.
+
+    The bytes covered by the checkpoint are re-hashed and compared; anything
+    after it was never checked, so it is dropped. A mismatch or a missing
+    checkpoint means starting over at 0.
+    """
+    try:
+        with open(checkpoint_path(part_path), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        size, expected = checkpoint["size"], checkpoint[HASH_NAME]
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0, new_hash()
+    if not os.path.exists(part_path) or os.path.getsize(part_path) < size:
+        return 0, new_hash()
+    digest = hash_into(new_hash(), part_path, size)
+    if digest.hexdigest() != expected:
+        return 0, new_hash()
+    return size, digest
+
+
+# ==========================================================
+# Verify
+# ==========================================================
+def verify_entry(directory, name, entry):
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return "MISSING"
+    if os.path.getsize(path) != entry["size"]:
+        return "SIZE MISMATCH"
+    return "OK" if hash_file(path) == entry[HASH_NAME] else "HASH MISMATCH"
+
+
+def verify_part(part_path):
+    offset, _ = resume_point(part_path)
+    try:
+        with open(checkpoint_path(part_path), encoding="utf-8") as f:
+            expected = json.load(f)["size"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return "CORRUPT (will restart)"
+    return "OK (resumable)" if offset == expected and expected else "CORRUPT (will restart)"
+
+
+def verify(directories, workers=VERIFY_WORKERS):
+    """Re-hash every manifest entry and .part checkpoint; returns True if all are intact."""
+    jobs = []
+    intact = True
+    for directory in directories:
+        if not os.path.isdir(directory):
+            print(f"❌ Not a directory, skipped: {directory}")
+            intact = False
+            continue
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+            print(f"⚠️ No manifest in {directory}")
+        jobs += [(os.path.join(directory, name), verify_entry, (directory, name, entry))
+                 for name, entry in entries.items()]
+        jobs += [(os.path.join(directory, name[:-5]), verify_part, (os.path.join(directory, name[:-5]),))
+                 for name in os.listdir(directory) if name.endswith(".part.hash")]
+
+    # hashlib releases the GIL on large updates, so threads hash in parallel.
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [(path, pool.submit(check, *args)) for path, check, args in jobs]
+        for path, future in futures:
+            status = future.result()
+            intact &= status.startswith("OK")
+            print(f"{'✅' if status.startswith('OK') else '❌'} {status:<22} {path}")
+    print(f"\n{len(jobs)} files checked, {'all intact' if intact else 'problems found'}.")
+    return intact
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "verify":
+        print("Usage: python ydm_integrity.py verify DIR [DIR ...]")
+        sys.exit(2)
+    sys.exit(0 if verify(sys.argv[2:]) else 1)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Machine-wide limits shared by every running downloader.
+
+ydm301.py, ydm108.py, ytd.py and ytdw.py register each download in a small
+JSON file under ~/Downloads. A job's share of the global bandwidth budget
+and of its host's connection budget is recomputed from the live entries, so
+shares rebalance as jobs start and finish. Entries carry a heartbeat;
+crashed jobs drop out once it goes stale.
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: best effort without a file lock
+    fcntl = None
+
+STATE_PATH = os.path.expanduser("~/Downloads/.ydm_jobs.json")
+HEARTBEAT_SECONDS = 5
+STALE_SECONDS = HEARTBEAT_SECONDS * 3
+
+# Flat global cap, e.g. "5M" (bytes/s, K/M/G suffixes; "0" = unlimited).
+BANDWIDTH_LIMIT = os.environ.get("YDM_BANDWIDTH_LIMIT", "0")
+# Time-of-day windows that override the flat cap, e.g.
+# "08:00-18:00=5M,18:00-08:00=0" (windows may wrap past midnight).
+BANDWIDTH_SCHEDULE = os.environ.get("YDM_BANDWIDTH_SCHEDULE", "")
+# Ceiling on sockets to one host across all jobs.
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("YDM_MAX_CONNECTIONS_PER_HOST", "32"))
+
+
+# ==========================================================
+# Rates and windows
+# ==========================================================
+def parse_rate(text):
+    """'5M' → 5242880 bytes/s; '0', '' or 'unlimited' → 0 (no cap)."""
+    text = (text or "").strip().upper().removesuffix("B")
+    if text in ("", "0", "UNLIMITED"):
+        return 0
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+
+def parse_schedule(text):
+    """'HH:MM-HH:MM=RATE,...' → [(start_minute, end_minute, bytes_per_second), ...]."""
+    windows = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        span, _, rate = part.partition("=")
+        start, _, end = span.partition("-")
+        to_minutes = lambda hhmm: int(hhmm.split(":")[0]) * 60 + int(hhmm.split(":")[1])
+        windows.append((to_minutes(start), to_minutes(end), parse_rate(rate)))
+    return windows
+
+
+def current_limit(now=None):
+    """Global bandwidth cap in force right now (0 = unlimited)."""
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end, rate in parse_schedule(BANDWIDTH_SCHEDULE):
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return rate
+    return parse_rate(BANDWIDTH_LIMIT)
+
+
+# ==========================================================
+# Connection budget
+# ==========================================================
+def allocate_connections(wants, ceiling=MAX_CONNECTIONS_PER_HOST):
+    """Max-min fair split of `ceiling` sockets between jobs asking for `wants[job_id]`.
+
+    Jobs asking for less than the fair share keep what they asked for and the
+    rest is split among the others. With more jobs than sockets, the first
+    `ceiling` jobs (in registration order) get one each and the rest get 0,
+    meaning they wait for a free socket; the total never exceeds `ceiling`.
+    """
+    allocation = {}
+    remaining = dict(wants)
+    if len(remaining) > ceiling:
+        queued = list(remaining)[max(ceiling, 0):]
+        allocation.update({job_id: 0 for job_id in queued})
+        remaining = {job_id: 1 for job_id in list(remaining)[:max(ceiling, 0)]}
+    budget = ceiling
+    while remaining:
+        fair = max(budget // len(remaining), 1)
+        modest = {job_id: want for job_id, want in remaining.items() if want <= fair}
+        if not modest:
+            allocation.update({job_id: fair for job_id in remaining})
+            break
+        for job_id, want in modest.items():
+            allocation[job_id] = want
+            budget -= want
+            del remaining[job_id]
+    return allocation
+
+
+# ==========================================================
+# Shared job registry
+# ==========================================================
+def update_state(change=None):
+    """Apply `change(jobs)` to the registry under a file lock and return the live jobs."""
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    with open(STATE_PATH, "a+", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                jobs = json.loads(f.read() or "{}")
+            except ValueError:
+                jobs = {}
+            cutoff = time.time() - STALE_SECONDS
+            jobs = {job_id: job for job_id, job in jobs.items() if job.get("heartbeat", 0) >= cutoff}
+            if change:
+                change(jobs)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(jobs))
+            return jobs
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class JobSlot:
+    """A running download's entry in the shared registry.
+
+    Use as a context manager around the transfer. `on_change(callback)`
+    calls callback(bytes_per_second) whenever this job's bandwidth share
+    changes (0 = unlimited); `on_connections_change(callback)` does the same
+    for its connection count to `host`, out of the `connections` it asked for.
+    """
+
+    def __init__(self, engine, host="", connections=0):
+        self.job_id = f"{os.getpid()}-{id(self):x}"
+        self.engine = engine
+        self.host = host
+        self.connections = connections
+        self.callbacks = []
+        self.connection_callbacks = []
+        self.stop = threading.Event()
+        self.thread = None
+        self.last_share = None
+        self.last_connections = None
+        self.started = False
+
+    def __enter__(self):
+        jobs = self._beat()
+        if self.connection_share(jobs) == 0:
+            print(f"⏳ {self.host} is at its {MAX_CONNECTIONS_PER_HOST}-connection ceiling; waiting for a free slot...")
+            try:
+                while self.connection_share(jobs) == 0:
+                    time.sleep(HEARTBEAT_SECONDS)
+                    jobs = self._beat()
+            except BaseException:
+                update_state(lambda jobs: jobs.pop(self.job_id, None))
+                raise
+        self.started = True
+        self.thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()  # a beat in flight would register the job again
+        update_state(lambda jobs: jobs.pop(self.job_id, None))
+        return False
+
+    def _beat(self):
+        def register(jobs):
+            jobs[self.job_id] = {"engine": self.engine, "host": self.host,
+                                 "connections": self.connections, "heartbeat": time.time()}
+        return update_state(register)
+
+    def _heartbeat(self):
+        while not self.stop.wait(HEARTBEAT_SECONDS):
+            jobs = self._beat()
+            share = self.bandwidth_share(jobs)
+            if share != self.last_share:
+                self.last_share = share
+                self._notify(self.callbacks, share)
+            connections = self.connection_share(jobs)
+            if connections != self.last_connections:
+                self.last_connections = connections
+                self._notify(self.connection_callbacks, connections)
+
+    @staticmethod
+    def _notify(callbacks, value):
+        for callback in callbacks:
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"⚠️ Could not apply new limit: {e}")
+
+    def bandwidth_share(self, jobs=None):
+        """Global cap split evenly across active jobs (0 = unlimited)."""
+        jobs = jobs if jobs is not None else update_state()
+        limit = current_limit()
+        if not limit:
+            return 0
+        return max(limit // max(len(jobs), 1), 1024)
+
+    def on_change(self, callback):
+        self.last_share = self.bandwidth_share()
+        self.callbacks.append(callback)
+        return self.last_share
+
+    def connection_share(self, jobs=None):
+        """This job's slice of the per-host connection ceiling (0 = wait for one).
+
+        A job that already started keeps at least one socket: its entry only
+        drops behind the queue if its heartbeat went stale and it re-registered.
+        """
+        if not self.connections:
+            return 0
+        jobs = jobs if jobs is not None else update_state()
+        wants = {job_id: job["connections"] for job_id, job in jobs.items()
+                 if job.get("host") == self.host and job.get("connections")}
+        wants[self.job_id] = self.connections
+        share = allocate_connections(wants).get(self.job_id, 0)
+        return max(share, 1) if self.started else share
+
+    def on_connections_change(self, callback):
+        self.last_connections = self.connection_share()
+        self.connection_callbacks.append(callback)
+        return self.last_connections
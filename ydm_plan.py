@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Metadata-only planning for ydm301.py, ydm108.py and ytd.py (--plan).
+
+A plan extracts every item of a URL or playlist in parallel without
+downloading, prints one JSON line per item as soon as it is known, and ends
+with a totals line whose ETA comes from the throughput of past downloads.
+"""
+import os
+import re
+import sys
+import json
+import time
+import statistics
+import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ydm_limits import current_limit
+
+PLAN_WORKERS = 8
+THROUGHPUT_PATH = os.path.expanduser("~/Downloads/.ydm_throughput.jsonl")
+THROUGHPUT_SAMPLES = 20
+# Per-source cursors for ydm301 --sync: IDs already mirrored, newest first.
+SYNC_PATH = os.path.expanduser("~/Downloads/.ydm_sync.json")
+
+UNITS = {"B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+# yt-dlp's native downloader: "[download] 100% of  12.34MiB in 00:00:05 at 2.41MiB/s"
+NATIVE_DONE = re.compile(r"\[download\] 100% of ~?\s*([\d.]+)(B|KiB|MiB|GiB) in [\d:]+ at\s+([\d.]+)(B|KiB|MiB|GiB)/s")
+# aria2c's summary table: "3b2f2e|OK  |   7.4MiB/s|/path/to/file"
+ARIA2_DONE = re.compile(r"\|OK\s*\|\s*([\d.]+)(B|KiB|MiB|GiB)/s\|")
+
+
+# ==========================================================
+# Throughput history
+# ==========================================================
+def record_throughput(bytes_per_second, engine):
+    if bytes_per_second <= 0:
+        return
+    record = {"bytes_per_second": int(bytes_per_second), "engine": engine, "timestamp": time.time()}
+    os.makedirs(os.path.dirname(THROUGHPUT_PATH), exist_ok=True)
+    with open(THROUGHPUT_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def record_from_output(line, engine):
+    """Record the average speed from a finished-download line of yt-dlp/aria2c output."""
+    match = NATIVE_DONE.search(line)
+    if match:
+        record_throughput(float(match.group(3)) * UNITS[match.group(4)], engine)
+        return
+    match = ARIA2_DONE.search(line)
+    if match:
+        record_throughput(float(match.group(1)) * UNITS[match.group(2)], engine)
+
+
+def throughput_hook(engine):
+    """yt-dlp progress hook that records each finished download's speed."""
+    def hook(d):
+        if d.get("status") == "finished" and d.get("elapsed"):
+            size = d.get("total_bytes") or d.get("downloaded_bytes") or 0
+            record_throughput(size / d["elapsed"], engine)
+    return hook
+
+
+def measured_throughput():
+    """Median speed of recent downloads in bytes/s, capped by the bandwidth limit (0 = unknown)."""
+    try:
+        with open(THROUGHPUT_PATH, encoding="utf-8") as f:
+            samples = [json.loads(line)["bytes_per_second"] for line in f if line.strip()]
+    except (OSError, ValueError, KeyError):
+        samples = []
+    speed = statistics.median(samples[-THROUGHPUT_SAMPLES:]) if samples else 0
+    limit = current_limit()
+    return min(speed, limit) if speed and limit else speed
+
+
+# ==========================================================
+# Extraction
+# ==========================================================
+def use_module():
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
+def list_entries(url):
+    """Watch URLs for every item of a playlist (flat, no per-item extraction), else [url]."""
+    if "list=" not in url:
+        return [url]
+    if use_module():
+        import yt_dlp
+        with yt_dlp.YoutubeDL({"quiet": True, "extract_flat": "in_playlist"}) as ydl:
+            info = ydl.extract_info(url, download=False)
+        ids = [e["id"] for e in info.get("entries") or [] if e and e.get("id")]
+    else:
+        out = subprocess.run(["yt-dlp", "--flat-playlist", "--print", "id", url],
+                             capture_output=True, text=True, check=True).stdout
+        ids = out.split()
+    return [f"https://www.youtube.com/watch?v={vid}" for vid in ids]
+
+
+def extract(url, fmt):
+    """Info dict for one video with `fmt` already resolved by yt-dlp."""
+    if use_module():
+        import yt_dlp
+        opts = {"quiet": True, "noplaylist": True, "format": fmt}
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            return ydl.extract_info(url, download=False)
+    out = subprocess.run(["yt-dlp", "-J", "--no-playlist", "-f", fmt, url],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def estimate_size(f, duration):
+    """Bytes of one format: its reported size, else bitrate x duration (0 = unknown)."""
+    size = f.get("filesize") or f.get("filesize_approx")
+    if not size and f.get("tbr") and duration:
+        size = f["tbr"] * 1000 / 8 * duration
+    return int(size or 0)
+
+
+def load_archive():
+    """IDs already mirrored by ydm301 --sync."""
+    try:
+        with open(SYNC_PATH, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    return {vid for cursor in state.values() for vid in cursor.get("seen", [])}
+
+
+def plan_record(info, archive):
+    chosen = info.get("requested_formats") or [info]
+    duration = info.get("duration")
+    return {
+        "id": info.get("id"),
+        "title": info.get("title"),
+        "formats": [f.get("format_id") for f in chosen],
+        "estimated_bytes": sum(estimate_size(f, duration) for f in chosen),
+        "duration": duration,
+        "archive": "hit" if info.get("id") in archive else "miss",
+    }
+
+
+# ==========================================================
+# Plan
+# ==========================================================
+def human_size(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def plan(url, fmt, out=sys.stdout):
+    """Stream one JSON line per item of `url`, then a totals line. Downloads nothing."""
+    archive = load_archive()
+    entries = list_entries(url)
+    totals = {"type": "totals", "items": 0, "failed": 0, "estimated_bytes": 0, "new_bytes": 0}
+
+    with ThreadPoolExecutor(PLAN_WORKERS) as pool:
+        futures = {pool.submit(extract, entry, fmt): entry for entry in entries}
+        for future in as_completed(futures):
+            try:
+                record = plan_record(future.result(), archive)
+            except Exception as e:
+                totals["failed"] += 1
+                record = {"url": futures[future], "error": str(e)}
+            else:
+                totals["items"] += 1
+                totals["estimated_bytes"] += record["estimated_bytes"]
+                if record["archive"] == "miss":
+                    totals["new_bytes"] += record["estimated_bytes"]
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+    speed = measured_throughput()
+    totals["bytes_per_second"] = int(speed)
+    totals["eta_seconds"] = round(totals["new_bytes"] / speed) if speed else None
+    out.write(json.dumps(totals) + "\n")
+
+    if speed:
+        eta = f"{totals['eta_seconds'] // 3600}h{totals['eta_seconds'] % 3600 // 60:02d}m"
+    else:
+        eta = "unknown (no download history yet)"
+    print(f"📦 {totals['items']} items, {human_size(totals['new_bytes'])} to download "
+          f"({human_size(totals['estimated_bytes'])} total), ETA {eta}", file=sys.stderr)
+    return totals
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Shared download queue with leases, for running workers on several machines.
+
+Producers enqueue URLs; workers lease one job at a time and renew the lease
+from a heartbeat thread while they download. If a worker crashes, its lease
+runs out and the job goes back to the queue for another node.
+
+SQLiteQueue keeps the queue in a database file (YDM_QUEUE) that all nodes
+can reach, e.g. on a shared volume whose file locking works (SMB/NFSv4 with
+locks). MemoryQueue has the same interface inside one process and stands in
+for it in tests and single-box runs.
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+QUEUE_PATH = os.environ.get("YDM_QUEUE", os.path.expanduser("~/Downloads/.ydm_queue.sqlite"))
+LEASE_SECONDS = 90
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+POLL_SECONDS = 5
+MAX_ATTEMPTS = 3
+
+
+def worker_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# ==========================================================
+# Backends
+# ==========================================================
+class SQLiteQueue:
+    """Queue in a SQLite file; every state change is one short write transaction."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            options TEXT NOT NULL DEFAULT '{}',
+            state TEXT NOT NULL DEFAULT 'queued',   -- queued, leased, done, failed
+            worker TEXT,
+            lease_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            updated REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_until);
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.local = threading.local()  # sqlite connections are per thread
+        self._db().executescript(self.SCHEMA)
+
+    def _db(self):
+        if not hasattr(self.local, "db"):
+            self.local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self.local.db.row_factory = sqlite3.Row
+        return self.local.db
+
+    @contextmanager
+    def _write(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")  # take the write lock up front
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def enqueue(self, url, options=None):
+        with self._write() as db:
+            db.execute("INSERT INTO jobs (url, options, updated) VALUES (?, ?, ?)",
+                       (url, json.dumps(options or {}), time.time()))
+
+    def lease(self, worker):
+        """Claim the oldest queued job, or one whose lease has expired.
+
+        An expired lease that already used MAX_ATTEMPTS means the job kept
+        killing its workers before they could report; it is marked failed.
+        """
+        now = time.time()
+        with self._write() as db:
+            db.execute("UPDATE jobs SET state = 'failed', worker = NULL, lease_until = NULL, "
+                       "result = 'lease expired', updated = ? "
+                       "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                       (now, now, MAX_ATTEMPTS))
+            row = db.execute("SELECT * FROM jobs WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?) "
+                             "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if not row:
+                return None
+            db.execute("UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                       "updated = ? WHERE id = ?", (worker, now + LEASE_SECONDS, now, row["id"]))
+        return {"id": row["id"], "url": row["url"], "options": json.loads(row["options"]),
+                "attempts": row["attempts"] + 1}
+
+    def renew(self, job_id, worker):
+        """Extend a lease; False if this worker no longer holds it."""
+        now = time.time()
+        with self._write() as db:
+            cur = db.execute("UPDATE jobs SET lease_until = ?, updated = ? "
+                             "WHERE id = ? AND worker = ? AND state = 'leased'",
+                             (now + LEASE_SECONDS, now, job_id, worker))
+        return cur.rowcount == 1
+
+    def release(self, job_id, worker):
+        """Give a job back untouched, e.g. when the worker is shutting down."""
+        with self._write() as db:
+            db.execute("UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL, "
+                       "attempts = attempts - 1, updated = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                       (time.time(), job_id, worker))
+
+    def complete(self, job_id, worker, ok, result=""):
+        """Report a result. Failures are queued again until MAX_ATTEMPTS."""
+        with self._write() as db:
+            db.execute("UPDATE jobs SET state = CASE WHEN ? THEN 'done' WHEN attempts >= ? THEN 'failed' "
+                       "ELSE 'queued' END, worker = NULL, lease_until = NULL, result = ?, updated = ? "
+                       "WHERE id = ? AND worker = ? AND state = 'leased'",
+                       (ok, MAX_ATTEMPTS, result, time.time(), job_id, worker))
+
+    def counts(self):
+        rows = self._db().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+
+class MemoryQueue:
+    """In-process stand-in for SQLiteQueue with the same methods."""
+
+    def __init__(self):
+        self.jobs = []
+        self.lock = threading.Lock()
+
+    def enqueue(self, url, options=None):
+        with self.lock:
+            self.jobs.append({"id": len(self.jobs) + 1, "url": url, "options": options or {}, "state": "queued",
+                              "worker": None, "lease_until": None, "attempts": 0, "result": None})
+
+    def lease(self, worker):
+        now = time.time()
+        with self.lock:
+            for job in self.jobs:
+                expired = job["state"] == "leased" and job["lease_until"] < now
+                if expired and job["attempts"] >= MAX_ATTEMPTS:
+                    job.update(state="failed", worker=None, lease_until=None, result="lease expired")
+                    continue
+                if job["state"] == "queued" or expired:
+                    job.update(state="leased", worker=worker, lease_until=now + LEASE_SECONDS,
+                               attempts=job["attempts"] + 1)
+                    return {key: job[key] for key in ("id", "url", "options", "attempts")}
+        return None
+
+    def _held(self, job_id, worker):
+        job = self.jobs[job_id - 1]
+        return job if job["state"] == "leased" and job["worker"] == worker else None
+
+    def renew(self, job_id, worker):
+        with self.lock:
+            job = self._held(job_id, worker)
+            if job:
+                job["lease_until"] = time.time() + LEASE_SECONDS
+            return job is not None
+
+    def release(self, job_id, worker):
+        with self.lock:
+            job = self._held(job_id, worker)
+            if job:
+                job.update(state="queued", worker=None, lease_until=None, attempts=job["attempts"] - 1)
+
+    def complete(self, job_id, worker, ok, result=""):
+        with self.lock:
+            job = self._held(job_id, worker)
+            if job:
+                state = "done" if ok else "failed" if job["attempts"] >= MAX_ATTEMPTS else "queued"
+                job.update(state=state, worker=None, lease_until=None, result=result)
+
+    def counts(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs:
+                counts[job["state"]] = counts.get(job["state"], 0) + 1
+            return counts
+
+
+# ==========================================================
+# Worker
+# ==========================================================
+def run_worker(queue, handler, worker=None, stop=None, exit_when_empty=False):
+    """Lease jobs and run handler(job) -> bool until stopped.
+
+    While a job runs, a heartbeat thread renews its lease. On Ctrl+C the
+    current job is released so another node picks it up straight away.
+    """
+    worker = worker or worker_name()
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        job = queue.lease(worker)
+        if not job:
+            if exit_when_empty:
+                return
+            stop.wait(POLL_SECONDS)
+            continue
+
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(HEARTBEAT_SECONDS):
+                if not queue.renew(job["id"], worker):
+                    print(f"⚠️ Lost the lease on job {job['id']}; its result will be ignored.")
+                    return
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        print(f"\n📥 Job {job['id']} (attempt {job['attempts']}): {job['url']}")
+        try:
+            ok = bool(handler(job))
+            queue.complete(job["id"], worker, ok, "ok" if ok else "failed")
+        except KeyboardInterrupt:
+            queue.release(job["id"], worker)
+            raise
+        except Exception as e:
+            queue.complete(job["id"], worker, False, str(e))
+        finally:
+            done.set()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Resume-aware retry engine for yt-dlp command lines.
+
+Failures are classified from the tail of yt-dlp/aria2c/ffmpeg output, and
+each class has its own retry budget and jittered backoff. Retries keep the
+existing .part/.aria2 state. They also reuse the extracted info JSON, so
+the video is only extracted again when its signed URLs have expired (403)
+or the failure is unknown.
+"""
+import os
+import re
+import time
+import random
+import hashlib
+import subprocess
+from collections import deque
+
+from ydm_plan import record_from_output
+
+INFO_CACHE_DIR = os.path.expanduser("~/.cache/ydm/info")
+INFO_MAX_AGE = 3600  # seconds; YouTube's signed URLs last a few hours
+
+# Checked in order; the first class whose pattern appears in the output wins.
+FAILURE_PATTERNS = [
+    ("disk_full", re.compile(r"No space left on device|Errno 28|Disk full", re.I)),
+    ("expired", re.compile(r"HTTP Error 403|403: Forbidden|status=403", re.I)),
+    ("throttled", re.compile(r"HTTP Error 429|Too Many Requests|status=429", re.I)),
+    ("ffmpeg", re.compile(r"Postprocessing:|Conversion failed|ffmpeg exited|Error opening (input|output)", re.I)),
+    ("network", re.compile(r"Connection reset|Errno 104|timed out|IncompleteRead|Connection aborted|"
+                           r"Temporary failure in name resolution|Unable to download|errorCode=(2|6|19|22)\b", re.I)),
+]
+
+# retries: attempts allowed for this class; base/cap: backoff bounds in
+# seconds; reextract: drop the cached info JSON before retrying.
+RETRY_POLICIES = {
+    "network": {"retries": 8, "base": 1, "cap": 60, "reextract": False},
+    "throttled": {"retries": 6, "base": 30, "cap": 600, "reextract": False},
+    "expired": {"retries": 3, "base": 1, "cap": 10, "reextract": True},
+    "ffmpeg": {"retries": 1, "base": 1, "cap": 5, "reextract": False},
+    "disk_full": {"retries": 0, "base": 0, "cap": 0, "reextract": False},
+    "unknown": {"retries": 3, "base": 2, "cap": 60, "reextract": True},
+}
+
+FAILURE_HINTS = {
+    "disk_full": "Disk is full. Free some space; partial files are kept for resume.",
+    "ffmpeg": "ffmpeg failed while post-processing; the download itself is kept.",
+}
+
+
+def classify_failure(lines):
+    """Failure class for the last lines of a failed run."""
+    text = "\n".join(lines)
+    for name, pattern in FAILURE_PATTERNS:
+        if pattern.search(text):
+            return name
+    return "unknown"
+
+
+def backoff_delay(failure, attempt):
+    """Jittered exponential backoff for the n-th retry of a failure class, never below its base."""
+    policy = RETRY_POLICIES[failure]
+    return random.uniform(policy["base"], max(policy["base"], min(policy["cap"], policy["base"] * 2 ** attempt)))
+
+
+def info_json_path(url):
+    os.makedirs(INFO_CACHE_DIR, exist_ok=True)
+    return os.path.join(INFO_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest())
+
+
+def attempt_command(command, url, reuse_info):
+    """yt-dlp command for one attempt: load the cached info JSON when allowed.
+
+    `command` ends with the URL. Playlists are always re-extracted because
+    --load-info-json only describes a single video.
+    """
+    if "--yes-playlist" in command:
+        return command
+    info_base = info_json_path(url)
+    info_file = info_base + ".info.json"
+    fresh = os.path.exists(info_file) and time.time() - os.path.getmtime(info_file) < INFO_MAX_AGE
+    if reuse_info and fresh:
+        return command[:-1] + ["--load-info-json", info_file]
+    return command[:-1] + ["--write-info-json", "-o", f"infojson:{info_base}", url]
+
+
+def run_with_retry(command, url, state=None, prepare=None):
+    """Run a yt-dlp command, retrying per failure class.
+
+    `state` maps failure class → retries already spent. Pass the dict saved
+    from an earlier run to carry backoff across restarts. `prepare`, if
+    given, adjusts each attempt's command (e.g. current rate limits).
+    Returns (succeeded, last failure class or None).
+    """
+    state = state if state is not None else {}
+    reuse_info = True
+    while True:
+        tail = deque(maxlen=60)
+        try:
+            cmd = attempt_command(prepare(command) if prepare else command, url, reuse_info)
+            with subprocess.Popen(cmd,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
+                for line in proc.stdout:
+                    print(line, end="")
+                    tail.append(line.rstrip())
+                    record_from_output(line, "yt-dlp")
+                proc.wait()
+        except FileNotFoundError as e:
+            print(f"❌ {e.filename} not found. Please install it or make sure it's in PATH.")
+            return False, "missing_tool"
+
+        if proc.returncode == 0:
+            return True, None
+
+        failure = classify_failure(tail)
+        policy = RETRY_POLICIES[failure]
+        spent = state.get(failure, 0)
+        if spent >= policy["retries"]:
+            print(f"❌ Giving up: {failure} failure after {spent} retries.")
+            if failure in FAILURE_HINTS:
+                print(f"💡 {FAILURE_HINTS[failure]}")
+            return False, failure
+
+        state[failure] = spent + 1
+        reuse_info = not policy["reextract"]
+        delay = backoff_delay(failure, spent)
+        action = "re-extracting" if policy["reextract"] else "resuming from partial files"
+        print(f"\n⚠️ {failure} failure ({spent + 1}/{policy['retries']}), {action} in {delay:.1f}s...")
+        time.sleep(delay)
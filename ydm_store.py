@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Content store shared by playlist downloads in ydm102.py and ydm108.py.
+
+Each video is stored once under ~/Downloads/.ydm_store, keyed by its ID and
+a format profile (a short hash of the format options). Playlist folders
+only hold links to the stored copy: a hardlink where possible, else a
+reflink, else a symlink. A video that sits in many playlists is therefore
+downloaded and stored once. yt-dlp's download archive skips stored IDs
+before they are even extracted.
+"""
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+STORE_DIR = os.path.expanduser("~/Downloads/.ydm_store")
+INDEX_PATH = os.path.join(STORE_DIR, "index.json")
+FICLONE = 0x40049409  # linux/fs.h: share extents with another file (btrfs, xfs)
+
+
+def profile_key(*options):
+    """Short, stable name for a set of format options, e.g. ('bestaudio', 'mp3')."""
+    return hashlib.sha1("\0".join(options).encode()).hexdigest()[:8]
+
+
+def archive_path(profile):
+    return os.path.join(STORE_DIR, f"{profile}.archive")
+
+
+def new_entries_path(profile):
+    return os.path.join(STORE_DIR, f"{profile}.new.tsv")
+
+
+def store_template(profile):
+    """Output template that downloads into the store instead of the playlist folder."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    return os.path.join(STORE_DIR, f"%(id)s.{profile}.%(ext)s")
+
+
+def store_args(profile):
+    """yt-dlp options that skip stored IDs and report what was added."""
+    return [
+        "--download-archive", archive_path(profile),
+        "--print-to-file", "after_move:%(id)s\t%(title)s\t%(filepath)s", new_entries_path(profile),
+    ]
+
+
+# ==========================================================
+# Index
+# ==========================================================
+def load_index():
+    try:
+        with open(INDEX_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index):
+    tmp = INDEX_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, INDEX_PATH)
+
+
+def ingest(profile):
+    """Move the entries yt-dlp just finished from the .new.tsv file into the index."""
+    index = load_index()
+    path = new_entries_path(profile)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 3:
+                    vid, title, filepath = parts
+                    index[f"{vid}.{profile}"] = {"title": title, "path": filepath}
+        save_index(index)
+        os.remove(path)
+    return index
+
+
+def forget(profile, vid, index):
+    """Drop a video whose stored file has gone, so the next run fetches it again."""
+    index.pop(f"{vid}.{profile}", None)
+    save_index(index)
+    path = archive_path(profile)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.split()[-1:] != [vid]]
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+
+# ==========================================================
+# Linking
+# ==========================================================
+def reflink(src, dst):
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+def link_file(src, dst):
+    """Link dst to src: hardlink, then reflink, then symlink. Returns the method used."""
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    if fcntl:
+        try:
+            reflink(src, dst)
+            return "reflink"
+        except OSError:
+            pass
+    try:
+        os.symlink(src, dst)
+        return "symlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def safe_name(text):
+    return "".join("_" if c in '/\\:*?"<>|' else c for c in text).strip() or "untitled"
+
+
+def playlist_listing(url, ytdlp):
+    """(playlist title, [video IDs]) from a flat listing; no video is extracted."""
+    out = subprocess.run(ytdlp + ["--flat-playlist", "--print", "%(playlist_title)s\t%(id)s", url],
+                         capture_output=True, text=True, check=True).stdout
+    rows = [line.split("\t", 1) for line in out.splitlines() if "\t" in line]
+    title = rows[0][0] if rows else "Playlist"
+    return title, [vid for _, vid in rows]
+
+
+def link_playlist(url, profile, dest_dir, ytdlp=("yt-dlp",)):
+    """Populate dest_dir/<playlist title>/ with links to the stored copies."""
+    index = ingest(profile)
+    title, ids = playlist_listing(url, list(ytdlp))
+    folder = os.path.join(dest_dir, safe_name(title))
+    os.makedirs(folder, exist_ok=True)
+
+    methods = {}
+    for vid in ids:
+        entry = index.get(f"{vid}.{profile}")
+        if not entry:
+            continue  # unavailable or failed; not in the store
+        if not os.path.exists(entry["path"]):
+            print(f"⚠️ {entry['title']} is missing from the store; it will be fetched next run.")
+            forget(profile, vid, index)
+            continue
+        ext = os.path.splitext(entry["path"])[1]
+        dst = os.path.join(folder, safe_name(entry["title"]) + ext)
+        if os.path.lexists(dst):
+            continue
+        method = link_file(entry["path"], dst)
+        methods[method] = methods.get(method, 0) + 1
+
+    summary = ", ".join(f"{count} {method}" for method, count in methods.items()) or "nothing new"
+    print(f"🔗 {folder}: {summary}")
+    return folder
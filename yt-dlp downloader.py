@@ -31,18 +31,19 @@ def download_video(url, format_type, quality):
     if format_type == 'mp4':
         output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
         
-        # Choose format based on quality selection
+        # Choose format based on quality selection. H.264 + AAC goes into mp4
+        # by stream copy; any other pair falls back to mkv instead of a re-encode.
         if quality == 'best':
-            video_format = 'bestvideo[height<=1080]+bestaudio/best[height<=1080]'
+            video_format = 'bestvideo[height<=1080][vcodec^=avc1]+bestaudio[ext=m4a]/bestvideo[height<=1080]+bestaudio/best[height<=1080]'
         elif quality == 'good':
-            video_format = 'bestvideo[height<=720]+bestaudio/best[height<=720]'
+            video_format = 'bestvideo[height<=720][vcodec^=avc1]+bestaudio[ext=m4a]/bestvideo[height<=720]+bestaudio/best[height<=720]'
         else:  # Fine quality
-            video_format = 'bestvideo[height<=480]+bestaudio/best[height<=480]'
+            video_format = 'bestvideo[height<=480][vcodec^=avc1]+bestaudio[ext=m4a]/bestvideo[height<=480]+bestaudio/best[height<=480]'
 
         command = [
             'yt-dlp',
             '-f', video_format,
-            '--merge-output-format', 'mp4',
+            '--merge-output-format', 'mp4/mkv',
             '--embed-thumbnail',
             '-o', output_template,
             url
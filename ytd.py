@@ -5,6 +5,13 @@ import subprocess
 import sys
 import re
 
+from ydm_limits import JobSlot
+from ydm_retry import run_with_retry
+from ydm_plan import plan
+from ydm_queue import SQLiteQueue, run_worker
+
+ARIA2_CONNECTIONS = 16  # asked for per download; the shared per-host budget may grant fewer
+
 def check_dependencies():
     """Check if required dependencies are installed."""
     print("Checking for dependencies...")
@@ -45,7 +52,7 @@ def get_youtube_url():
             sys.exit(1)
         return url
     else:
-        print("Usage: ytd <YouTube URL>")
+        print("Usage: ytd [--plan] <YouTube URL> | ytd --worker")
         sys.exit(1)
 
 def choose_format():
@@ -71,7 +78,7 @@ def choose_format():
         print("Invalid choice! Please enter '1', '2', '3', or '4'.")
         return choose_format()  # Ask again if the choice is invalid
 
-def download_video(url, format_type, is_audio, retries=3):
+def download_video(url, format_type, is_audio):
     """Download the video or audio using yt-dlp and aria2c."""
     print("Preparing to download...")
 
@@ -91,7 +98,7 @@ def download_video(url, format_type, is_audio, retries=3):
             '--embed-thumbnail',
             '-o', output_template,
             '--external-downloader', 'aria2c',
-            '--external-downloader-args', '-x 16 -s 16 -k 1M',
+            '--external-downloader-args', '-x {conns} -s {conns} -k 1M --continue=true',
             url
         ]
     else:
@@ -102,24 +109,47 @@ def download_video(url, format_type, is_audio, retries=3):
             '--embed-thumbnail',
             '-o', output_template,
             '--external-downloader', 'aria2c',
-            '--external-downloader-args', '-x 16 -s 16 -k 1M',
+            '--external-downloader-args', '-x {conns} -s {conns} -k 1M --continue=true',
             url
         ]
 
-    for attempt in range(retries):
-        print(f"Download attempt {attempt + 1}...")
-        try:
-            subprocess.run(command, check=True)
-            print(f"Download completed successfully. Saved to: {output_template}")
-            return
-        except subprocess.CalledProcessError as e:
-            print(f"Download error: {str(e)}")
-            if attempt == retries - 1:
-                print("Download failed after all attempts.")
-                sys.exit(1)
+    with JobSlot("ytd", "googlevideo.com", ARIA2_CONNECTIONS) as slot:
+        def prepare(cmd):
+            # Take each attempt's share of the per-host connection budget
+            conns = str(slot.connection_share())
+            return [arg.replace('{conns}', conns) for arg in cmd]
+
+        ok, _ = run_with_retry(command, url, prepare=prepare)
+    if not ok:
+        print("Download failed after all attempts.")
+        sys.exit(1)
+    print(f"Download completed successfully. Saved to: {output_template}")
+
+def queue_job(job):
+    """Download one job from the shared queue (see ydm301.py --enqueue)."""
+    quality = job["options"].get("quality", "1080")
+    is_audio = quality == "audio"
+    format_type = 'mp3' if is_audio else f'bestvideo[height<={quality}]+bestaudio'
+    try:
+        download_video(job["url"], format_type, is_audio)
+        return True
+    except SystemExit:  # download_video exits on failure
+        return False
 
 def main():
     """Main function to orchestrate the download."""
+    if len(sys.argv) == 2 and sys.argv[1] == '--worker':
+        # ytd --worker: take jobs from the shared queue until Ctrl+C
+        check_dependencies()
+        try:
+            run_worker(SQLiteQueue(), queue_job)
+        except KeyboardInterrupt:
+            print("Worker stopped; its job went back to the queue.")
+        return
+    if len(sys.argv) > 2 and sys.argv[1] == '--plan':
+        # ytd --plan <YouTube URL>: sizes and ETA only, nothing is downloaded
+        plan(sys.argv[2], 'bestvideo[height<=1080]+bestaudio')
+        return
     check_dependencies()
     url = get_youtube_url()
     format_type, is_audio = choose_format()
@@ -1,10 +1,19 @@
 import os
 import re
+import time
+import shutil
+import socket
+import secrets
 import requests
 import subprocess
 import logging
 from urllib.parse import unquote, urlsplit
 
+from ydm_limits import JobSlot
+from ydm_integrity import CHUNK_SIZE, new_hash, record, resume_point, save_checkpoint, checkpoint_path
+
+CHECKPOINT_BYTES = 64 * 1024 * 1024  # hash checkpoint interval for .part files
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -62,6 +71,111 @@ def get_connection_count():
         logging.warning("Invalid input for connections. Setting to default (8).")
         return 8
 
+def has_free_space(download_path, file_size):
+    """ Check the target volume can hold the file (plus 5% headroom) before starting. """
+    if file_size == 0:
+        return True  # Unknown size, nothing to check against
+    free = shutil.disk_usage(download_path).free
+    if free < file_size * 1.05:
+        logging.error(f"Not enough disk space: {file_size / (1024 * 1024):.2f} MB needed, "
+                      f"{free / (1024 * 1024):.2f} MB free in {download_path}.")
+        return False
+    return True
+
+def file_allocation(file_size):
+    """ Reserve the full file up front with fallocate when the size is known and supported. """
+    if file_size and hasattr(os, "posix_fallocate"):
+        return "--file-allocation=falloc"
+    return "--file-allocation=trunc"
+
+def free_port():
+    """ Ask the OS for an unused local port for aria2c's RPC listener. """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def aria2_rpc(port, secret, method, *params):
+    """ Call aria2c's JSON-RPC interface; returns the result, or None if it is unreachable. """
+    payload = {"jsonrpc": "2.0", "id": "ytdw", "method": method, "params": [f"token:{secret}", *params]}
+    try:
+        return requests.post(f"http://127.0.0.1:{port}/jsonrpc", json=payload, timeout=5).json().get("result")
+    except (requests.RequestException, ValueError):
+        return None
+
+def run_aria2c(command, slot):
+    """ Run aria2c with RPC enabled so its bandwidth share can change mid-download.
+
+    With RPC on, aria2c keeps running after the transfer ends, so we poll its
+    stats and shut it down ourselves. Returns True when the download completed.
+    """
+    port, secret = free_port(), secrets.token_hex(16)
+    rate = slot.bandwidth_share()
+    proc = subprocess.Popen(command + ["--enable-rpc", f"--rpc-listen-port={port}", f"--rpc-secret={secret}",
+                                       f"--max-overall-download-limit={rate}"])
+    slot.on_change(lambda share: aria2_rpc(port, secret, "aria2.changeGlobalOption",
+                                           {"max-overall-download-limit": str(share)}))
+    try:
+        while proc.poll() is None:
+            time.sleep(1)
+            stat = aria2_rpc(port, secret, "aria2.getGlobalStat")
+            if not stat or stat["numActive"] != "0" or stat["numWaiting"] != "0" or stat["numStoppedTotal"] == "0":
+                continue
+            stopped = aria2_rpc(port, secret, "aria2.tellStopped", 0, 10, ["status", "errorMessage"]) or []
+            aria2_rpc(port, secret, "aria2.shutdown")
+            proc.wait()
+            errors = [d.get("errorMessage") for d in stopped if d.get("status") != "complete"]
+            for error in errors:
+                logging.error(f"aria2c: {error}")
+            return bool(stopped) and not errors
+        return proc.returncode == 0
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+
+def download_native(url, file_path, slot):
+    """ Stream the file with requests, hashing the bytes as they are written.
+
+    Progress goes to <file>.part with a hash checkpoint every CHECKPOINT_BYTES,
+    so an interrupted download resumes (HTTP Range) only after the partial
+    data checks out. Returns the digest of the finished file.
+    """
+    part = file_path + ".part"
+    offset, digest = resume_point(part)
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        logging.info(f"Resuming at {offset / (1024 * 1024):.2f} MB (partial data verified).")
+
+    rate = {"share": slot.on_change(lambda share: rate.update(share=share))}
+    with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            logging.warning("Server ignored the range request; starting over.")
+            offset, digest = 0, new_hash()
+        with open(part, 'r+b' if offset else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            written, unsaved, started = offset, 0, time.monotonic()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+                unsaved += len(chunk)
+                if unsaved >= CHECKPOINT_BYTES:
+                    f.flush()
+                    save_checkpoint(part, written, digest.hexdigest())
+                    unsaved = 0
+                if rate["share"]:
+                    # Pace to this job's bandwidth share
+                    ahead = (written - offset) / rate["share"] - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+    os.replace(part, file_path)
+    if os.path.exists(checkpoint_path(part)):
+        os.remove(checkpoint_path(part))
+    return digest.hexdigest()
+
 def download_with_aria2c(url, download_path):
     """ Download file using aria2c. """
     filename = get_filename_from_url(url)
@@ -70,33 +184,52 @@ def download_with_aria2c(url, download_path):
     file_path = os.path.join(download_path, filename)
 
     file_size = get_file_size(url)
+    if not has_free_space(download_path, file_size):
+        return
     num_segments = determine_segments(file_size)
-    connection_count = get_connection_count()
-    logging.info(f"File Size: {file_size / (1024 * 1024):.2f} MB, Estimated Segments: {num_segments}")
-    logging.info(f"Using {connection_count} connections per server.")
-
-    # Constructing the aria2c command
-    command = [
-        "aria2c",
-        url,
-        "--out", filename,
-        "--dir", download_path,
-        "--check-certificate=false",
-        f"--split={num_segments}",
-        f"--max-connection-per-server={connection_count}",  # Set user-defined connection count
-        "--min-split-size=1M",  # Minimum split size for download chunks
-        "--enable-http-pipelining=true",  # Enable HTTP/2 pipelining, if supported
-        "--file-allocation=trunc"
-    ]
+    requested_connections = get_connection_count()
 
-    try:
-        logging.info("Checking aria2c installation...")
-        subprocess.run(["aria2c", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logging.info(f"Starting download with aria2c... Command: {' '.join(command)}")
-        subprocess.run(command, check=True)
-        logging.info(f"Download completed: {file_path}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Download failed: {e}")
+    with JobSlot("ytdw", urlsplit(url).hostname or "", requested_connections) as slot:
+        # Other jobs on the same host share the per-host connection ceiling
+        connection_count = slot.connection_share()
+        logging.info(f"File Size: {file_size / (1024 * 1024):.2f} MB, Estimated Segments: {num_segments}")
+        logging.info(f"Using {connection_count} of {requested_connections} requested connections per server.")
+
+        if not shutil.which("aria2c"):
+            logging.warning("aria2c not found. Falling back to the built-in downloader.")
+            try:
+                digest = download_native(url, file_path, slot)
+                record(file_path, digest, url)
+                logging.info(f"Download completed: {file_path} (blake2b {digest[:16]}…)")
+            except (requests.RequestException, OSError) as e:
+                logging.error(f"Download failed: {e}")
+            return
+
+        # Constructing the aria2c command
+        command = [
+            "aria2c",
+            url,
+            "--out", filename,
+            "--dir", download_path,
+            "--check-certificate=false",
+            f"--split={num_segments}",
+            f"--max-connection-per-server={connection_count}",  # Connection count granted by the shared budget
+            "--min-split-size=1M",  # Minimum split size for download chunks
+            "--enable-http-pipelining=true",  # Enable HTTP/2 pipelining, if supported
+            file_allocation(file_size)
+        ]
+
+        try:
+            logging.info("Checking aria2c installation...")
+            subprocess.run(["aria2c", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logging.info(f"Starting download with aria2c... Command: {' '.join(command)}")
+            if not run_aria2c(command, slot):
+                raise subprocess.CalledProcessError(1, command)
+            # aria2c writes segments out of order, so hash the finished file once
+            digest = record(file_path, source=url)
+            logging.info(f"Download completed: {file_path} (blake2b {digest[:16]}…)")
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Download failed: {e}")
 
 if __name__ == "__main__":
     download_url = input("Enter the download URL: ").strip()